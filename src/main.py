@@ -59,6 +59,17 @@ def create_app(config_name=None):
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     else:
         app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+        # Size the pool for max_concurrent_requests + workers * 2 + 10 connections; each
+        # enterprise request holds one across permission checks, lookups and commits.
+        # Across processes keep processes * (pool_size + max_overflow) under the server's max_connections
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 25)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 25)),
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,
+            # Reuse the most recently returned connection so idle ones can time out upstream
+            'pool_use_lifo': True,
+        }
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     # Initialize database
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, JSON, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 import uuid
@@ -166,6 +166,9 @@ class SupportTicket(db.Model):
 class TicketMessage(db.Model):
     """Messages within support tickets"""
     __tablename__ = 'ticket_messages'
+    __table_args__ = (
+        Index('ix_ticket_messages_ticket_id_id', 'ticket_id', 'id'),
+    )
     
     id = Column(Integer, primary_key=True)
     ticket_id = Column(Integer, ForeignKey('support_tickets.id'), nullable=False)
@@ -191,7 +194,7 @@ class LiveChatSession(db.Model):
     __tablename__ = 'live_chat_sessions'
     
     id = Column(Integer, primary_key=True)
-    session_id = Column(String(36), unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
+    session_id = Column(String(36), unique=True, index=True, nullable=False, default=lambda: str(uuid.uuid4()))
     user_id = Column(Integer, ForeignKey('auth_users.id'))
     visitor_id = Column(String(36))
     agent_id = Column(Integer, ForeignKey('auth_users.id'))
@@ -204,6 +207,7 @@ class LiveChatSession(db.Model):
     ended_at = Column(DateTime)
     rating = Column(Integer)
     feedback = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     def to_dict(self):
         return {
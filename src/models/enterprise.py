@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from enum import Enum as PyEnum
@@ -284,6 +284,11 @@ class AuditLog(Base):
     # Relationships
     organization = relationship("Organization", back_populates="audit_logs")
     
+    __table_args__ = (
+        Index('ix_audit_org_time', 'organization_id', timestamp.desc(), id.desc()),
+        Index('ix_audit_org_action_time', 'organization_id', 'action', 'timestamp'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -5,7 +5,9 @@ import enum
 import json
 import secrets
 import hashlib
-from sqlalchemy import func, Text
+import hmac
+from sqlalchemy import func, Text, text
+from sqlalchemy.orm import raiseload
 
 class IntegrationType(enum.Enum):
     GOOGLE_MY_BUSINESS = "google_my_business"
@@ -96,7 +98,7 @@ class Integration(db.Model):
             'sync_frequency': self.sync_frequency,
             'token_expires_at': self.token_expires_at.isoformat() if self.token_expires_at else None,
             'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
     def is_token_expired(self):
@@ -172,7 +174,7 @@ class WebhookEndpoint(db.Model):
             'success_rate': round((self.successful_deliveries / max(1, self.total_deliveries)) * 100, 2),
             'last_delivery_at': self.last_delivery_at.isoformat() if self.last_delivery_at else None,
             'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
     def get_events(self):
@@ -189,14 +191,30 @@ class WebhookEndpoint(db.Model):
         self.events = json.dumps(event_list)
     
     def generate_signature(self, payload):
-        """Generate webhook signature for payload verification"""
+        """Generate an HMAC-SHA256 webhook signature for payload verification"""
         if not self.secret:
             return None
         
-        signature = hashlib.sha256(
-            (self.secret + payload).encode('utf-8')
-        ).hexdigest()
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        signature = hmac.new(self.secret.encode('utf-8'), payload, hashlib.sha256).hexdigest()
         return f"sha256={signature}"
+    
+    def generate_legacy_signature(self, payload):
+        """Pre-HMAC signature (plain SHA-256 of secret + payload), sent until receivers move to HMAC"""
+        if not self.secret:
+            return None
+        
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        return f"sha256={hashlib.sha256(self.secret.encode('utf-8') + payload).hexdigest()}"
+    
+    def verify_signature(self, payload, signature):
+        """Check a received signature against the payload in constant time"""
+        expected = self.generate_signature(payload)
+        if not expected or not signature:
+            return False
+        return hmac.compare_digest(expected, signature)
 
 class WebhookDelivery(db.Model):
     __tablename__ = 'webhook_deliveries'
@@ -238,6 +256,14 @@ class WebhookDelivery(db.Model):
 
 class APIKey(db.Model):
     __tablename__ = 'api_keys'
+    __table_args__ = (
+        # Authentication only ever looks up active keys; a partial index keeps that lookup small
+        db.Index(
+            'idx_apikeys_hash_active', 'key_hash',
+            postgresql_where=text('is_active = true'),
+            sqlite_where=text('is_active = 1')
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('auth_users.id'), nullable=False)
@@ -292,7 +318,7 @@ class APIKey(db.Model):
             'is_active': self.is_active,
             'expires_at': self.expires_at.isoformat() if self.expires_at else None,
             'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
         
         if include_key and hasattr(self, '_generated_key'):
@@ -406,12 +432,18 @@ class IntegrationManager:
     """Helper class for integration management operations"""
     
     @staticmethod
-    def get_user_integrations(user_id, integration_type=None):
-        """Get integrations for a user, optionally filtered by type"""
-        query = Integration.query.filter_by(user_id=user_id)
+    def user_integrations_query(user_id, integration_type=None):
+        """Query for a user's integrations, optionally filtered by type"""
+        # to_dict reads only columns; raiseload turns any future relationship access into an error, not an N+1
+        query = Integration.query.options(raiseload('*')).filter_by(user_id=user_id)
         if integration_type:
             query = query.filter_by(integration_type=integration_type)
-        return query.all()
+        return query
+    
+    @staticmethod
+    def get_user_integrations(user_id, integration_type=None):
+        """Get integrations for a user, optionally filtered by type"""
+        return IntegrationManager.user_integrations_query(user_id, integration_type).all()
     
     @staticmethod
     def create_integration(user_id, name, integration_type, config_data=None):
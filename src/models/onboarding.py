@@ -3,7 +3,10 @@ from src.models.user import db
 from src.models.auth import AuthUser
 import enum
 import json
-from sqlalchemy import Text, Boolean
+from sqlalchemy import Text, Boolean, update, text, TypeDecorator
+from sqlalchemy.orm import joinedload, load_only
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 class OnboardingStatus(enum.Enum):
     NOT_STARTED = "not_started"
@@ -31,6 +34,30 @@ class WidgetType(enum.Enum):
     PERFORMANCE_SUMMARY = "performance_summary"
     TEAM_ACTIVITY = "team_activity"
 
+class TagList(TypeDecorator):
+    """JSONB tag list on Postgres, JSON text elsewhere; legacy comma-separated values still load as lists"""
+    impl = Text
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(Text())
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        return json.dumps(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        try:
+            return json.loads(value)
+        except ValueError:
+            # Rows written before tags became a JSON list hold "a,b,c"
+            return value.split(',') if value else []
+
 class UserOnboarding(db.Model):
     __tablename__ = 'user_onboarding'
     
@@ -98,6 +125,20 @@ class UserOnboarding(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
     
+    def to_partial_dict(self, fields):
+        """Serialize only the named columns, without touching any other attribute"""
+        result = {}
+        for field in fields:
+            value = getattr(self, field)
+            if field in ('completed_steps', 'skipped_steps'):
+                value = json.loads(value) if value else []
+            elif isinstance(value, enum.Enum):
+                value = value.value
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            result[field] = value
+        return result
+    
     def get_completed_steps(self):
         """Get list of completed step IDs"""
         if not self.completed_steps:
@@ -182,6 +223,17 @@ class UserTourProgress(db.Model):
 
 class DashboardLayout(db.Model):
     __tablename__ = 'dashboard_layouts'
+    __table_args__ = (
+        # At most one default layout per user; also turns "find the default" into a one-row index lookup
+        db.Index(
+            'uq_dashboard_layouts_default_user', 'user_id',
+            unique=True,
+            postgresql_where=text('is_default = true'),
+            sqlite_where=text('is_default = 1')
+        ),
+        # GIN index for tag containment queries; JSON columns elsewhere can't be indexed this way
+        db.Index('ix_dashboard_layouts_tags', 'tags', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('auth_users.id'), nullable=False)
@@ -194,7 +246,7 @@ class DashboardLayout(db.Model):
     
     # Metadata
     description = db.Column(db.String(500))
-    tags = db.Column(db.String(500))  # Comma-separated tags
+    tags = db.Column(TagList)  # List of tag strings
     
     # Usage tracking
     last_used_at = db.Column(db.DateTime)
@@ -218,7 +270,7 @@ class DashboardLayout(db.Model):
             'is_default': self.is_default,
             'is_active': self.is_active,
             'description': self.description,
-            'tags': self.tags.split(',') if self.tags else [],
+            'tags': self.tags or [],
             'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None,
             'usage_count': self.usage_count,
             'created_at': self.created_at.isoformat(),
@@ -355,6 +407,14 @@ class UserPreferences(db.Model):
 
 class FeatureAnnouncement(db.Model):
     __tablename__ = 'feature_announcements'
+    __table_args__ = (
+        # Dashboard loads only ever ask for active announcements inside their scheduling window
+        db.Index(
+            'ix_feature_announcements_active_window', 'start_date', 'end_date',
+            postgresql_where=text('is_active = true'),
+            sqlite_where=text('is_active = 1')
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -434,6 +494,10 @@ class FeatureAnnouncement(db.Model):
 
 class UserAnnouncementView(db.Model):
     __tablename__ = 'user_announcement_views'
+    __table_args__ = (
+        # One view record per user and announcement; the upserts in OnboardingManager conflict on it
+        db.UniqueConstraint('user_id', 'announcement_id', name='uq_announcement_views_user_announcement'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('auth_users.id'), nullable=False)
@@ -467,15 +531,27 @@ class OnboardingManager:
     """Helper class for onboarding management operations"""
     
     @staticmethod
-    def get_or_create_onboarding(user_id):
-        """Get or create onboarding record for user"""
-        onboarding = UserOnboarding.query.filter_by(user_id=user_id).first()
+    def get_or_create_onboarding(user_id, load_tours=False):
+        """Get or create onboarding record for user, optionally with its tour progress"""
+        query = UserOnboarding.query.filter_by(user_id=user_id)
+        if load_tours:
+            # Joined eager load brings the tour rows back in the same round trip
+            query = query.options(joinedload(UserOnboarding.tour_progress))
+        onboarding = query.first()
         if not onboarding:
             onboarding = UserOnboarding(user_id=user_id)
             db.session.add(onboarding)
             db.session.commit()
         return onboarding
     
+    @staticmethod
+    def get_onboarding_fields(user_id, fields):
+        """Get the onboarding record with only the given columns loaded, creating it if missing"""
+        onboarding = UserOnboarding.query.options(
+            load_only(*(getattr(UserOnboarding, field) for field in fields))
+        ).filter_by(user_id=user_id).first()
+        return onboarding or OnboardingManager.get_or_create_onboarding(user_id)
+    
     @staticmethod
     def start_onboarding(user_id):
         """Start onboarding process for user"""
@@ -501,6 +577,15 @@ class OnboardingManager:
         db.session.commit()
         return onboarding
     
+    @staticmethod
+    def clear_default_layout(user_id, except_id=None):
+        """Unset the user's default layout so another one can take its place"""
+        # Served by the partial unique index, so this touches at most one row
+        query = DashboardLayout.query.filter_by(user_id=user_id, is_default=True)
+        if except_id is not None:
+            query = query.filter(DashboardLayout.id != except_id)
+        query.update({'is_default': False})
+    
     @staticmethod
     def get_user_preferences(user_id):
         """Get or create user preferences"""
@@ -512,37 +597,72 @@ class OnboardingManager:
         return preferences
     
     @staticmethod
-    def get_active_announcements(user_role=None):
-        """Get active feature announcements for user role"""
+    def active_announcements_query(user_role=None):
+        """Query for announcements that are active, inside their scheduling window and aimed at a role"""
+        now = datetime.utcnow()
         query = FeatureAnnouncement.query.filter(
             FeatureAnnouncement.is_active == True,
-            FeatureAnnouncement.start_date <= datetime.utcnow()
-        )
-        
-        # Filter by end date
-        query = query.filter(
+            FeatureAnnouncement.start_date <= now,
             db.or_(
                 FeatureAnnouncement.end_date.is_(None),
-                FeatureAnnouncement.end_date > datetime.utcnow()
+                FeatureAnnouncement.end_date > now
             )
         )
         
-        announcements = query.all()
-        
-        # Filter by user role if specified
+        # target_roles holds a JSON array, so a quoted role name only matches a whole element
         if user_role:
-            filtered_announcements = []
-            for announcement in announcements:
-                if announcement.target_roles:
-                    try:
-                        target_roles = json.loads(announcement.target_roles)
-                        if user_role.value in target_roles or 'all' in target_roles:
-                            filtered_announcements.append(announcement)
-                    except:
-                        filtered_announcements.append(announcement)
-                else:
-                    filtered_announcements.append(announcement)
-            return filtered_announcements
+            query = query.filter(db.or_(
+                FeatureAnnouncement.target_roles.is_(None),
+                FeatureAnnouncement.target_roles == '',
+                FeatureAnnouncement.target_roles.contains(json.dumps(user_role.value), autoescape=True),
+                FeatureAnnouncement.target_roles.contains('"all"')
+            ))
+        return query
+    
+    @staticmethod
+    def get_active_announcements(user_role=None):
+        """Get active feature announcements for user role"""
+        return OnboardingManager.active_announcements_query(user_role).all()
+    
+    @staticmethod
+    def announcements_with_views_query(user_id, user_role=None):
+        """Query for active announcements paired with the user's view record (or None) via one outer join"""
+        return OnboardingManager.active_announcements_query(user_role).add_entity(UserAnnouncementView).outerjoin(
+            UserAnnouncementView,
+            db.and_(
+                UserAnnouncementView.announcement_id == FeatureAnnouncement.id,
+                UserAnnouncementView.user_id == user_id
+            )
+        )
+    
+    @staticmethod
+    def upsert_announcement_view(user_id, announcement_id, **fields):
+        """Create the user's view record for an announcement, or apply fields to the existing one"""
+        dialect = db.engine.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            # One INSERT ... ON CONFLICT instead of a SELECT followed by an INSERT or UPDATE
+            insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+            stmt = insert(UserAnnouncementView).values(user_id=user_id, announcement_id=announcement_id, **fields)
+            conflict = ['user_id', 'announcement_id']
+            if fields:
+                stmt = stmt.on_conflict_do_update(index_elements=conflict, set_=fields)
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=conflict)
+            db.session.execute(stmt)
+            return
         
-        return announcements
-
+        view = UserAnnouncementView.query.filter_by(user_id=user_id, announcement_id=announcement_id).first()
+        if not view:
+            view = UserAnnouncementView(user_id=user_id, announcement_id=announcement_id)
+            db.session.add(view)
+        for field, value in fields.items():
+            setattr(view, field, value)
+    
+    @staticmethod
+    def increment_announcement_views(announcement_id, views=1):
+        """Add to an announcement's view counter in place"""
+        db.session.execute(
+            update(FeatureAnnouncement)
+            .where(FeatureAnnouncement.id == announcement_id)
+            .values(view_count=FeatureAnnouncement.view_count + views)
+        )
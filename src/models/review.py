@@ -20,6 +20,10 @@ class ResponseStatus(enum.Enum):
 
 class Review(db.Model):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # Covers the public API's platform/rating filters; INCLUDE lets Postgres count and page from the index alone
+        db.Index('idx_reviews_platform_rating', 'platform', 'rating', postgresql_include=['id']),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     platform = db.Column(db.Enum(Platform), nullable=False)
@@ -43,6 +43,14 @@ class SubscriptionPlan(db.Model):
     annual_price = db.Column(Numeric(10, 2), nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     sort_order = db.Column(db.Integer, default=0)
+    
+    # Stripe Price objects for this plan and the amounts (in cents) they were created with;
+    # a new Price is created on first use and whenever the plan's price no longer matches
+    stripe_monthly_price_id = db.Column(db.String(255))
+    stripe_annual_price_id = db.Column(db.String(255))
+    stripe_monthly_price_amount = db.Column(db.Integer)
+    stripe_annual_price_amount = db.Column(db.Integer)
+    
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -75,6 +83,9 @@ class SubscriptionPlan(db.Model):
 
 class PlanFeature(db.Model):
     __tablename__ = 'plan_features'
+    __table_args__ = (
+        db.Index('ix_plan_feature_plan_type', 'plan_id', 'feature_type'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     plan_id = db.Column(db.Integer, db.ForeignKey('subscription_plans.id'), nullable=False)
@@ -101,6 +112,11 @@ class PlanFeature(db.Model):
 
 class UserSubscription(db.Model):
     __tablename__ = 'user_subscriptions'
+    __table_args__ = (
+        # Most requests start from the user's active subscription; webhooks look rows up by Stripe id
+        db.Index('ix_usersub_user_status', 'user_id', 'status'),
+        db.Index('ix_usersub_stripe_sub_id', 'stripe_subscription_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('auth_users.id'), nullable=False)
@@ -113,6 +129,7 @@ class UserSubscription(db.Model):
     end_date = db.Column(db.DateTime)
     trial_end_date = db.Column(db.DateTime)
     canceled_at = db.Column(db.DateTime)
+    cancel_at_period_end = db.Column(db.Boolean, nullable=False, default=False)
     
     # Billing information
     current_period_start = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -181,6 +198,10 @@ class UserSubscription(db.Model):
 
 class FeatureUsage(db.Model):
     __tablename__ = 'feature_usage'
+    __table_args__ = (
+        # Usage reads always look up one subscription's feature for a billing period
+        db.Index('ix_feature_usage_subscription_feature_period', 'subscription_id', 'feature_type', 'usage_period_start'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     subscription_id = db.Column(db.Integer, db.ForeignKey('user_subscriptions.id'), nullable=False)
@@ -204,6 +225,35 @@ class FeatureUsage(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+class Invoice(db.Model):
+    __tablename__ = 'invoices'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('auth_users.id'), nullable=False)
+    subscription_id = db.Column(db.Integer, db.ForeignKey('user_subscriptions.id'), nullable=False)
+    stripe_invoice_id = db.Column(db.String(255), nullable=False, unique=True)
+    amount = db.Column(Numeric(10, 2), nullable=False)
+    currency = db.Column(db.String(3), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    invoice_date = db.Column(db.DateTime, nullable=False)
+    due_date = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Invoice {self.stripe_invoice_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'stripe_invoice_id': self.stripe_invoice_id,
+            'amount': float(self.amount),
+            'currency': self.currency,
+            'status': self.status,
+            'invoice_date': self.invoice_date.isoformat(),
+            'due_date': self.due_date.isoformat() if self.due_date else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class SubscriptionManager:
     """Helper class for subscription management operations"""
     
@@ -1,9 +1,19 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, g, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta
+import os
+import base64
 import uuid
+from enum import Enum as PyEnum
 import json
+import orjson
 from functools import wraps
+from itertools import chain
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from src.models.enterprise import (
     Organization, Team, OrganizationUser, TeamMember, BusinessLocation,
@@ -11,11 +21,47 @@ from src.models.enterprise import (
     OrganizationTier, PermissionType, AuditAction
 )
 from src.models.auth import AuthUser, UserRole
+from src.models.user import db as app_db
 from src.routes.auth import token_required
+from src.services.cache import cache_get, cache_set, cache_delete, cache_delete_pattern
+from src.services.audit_buffer import AuditLogBuffer, get_failure_logger
 
 enterprise_bp = Blueprint('enterprise', __name__)
 db = SQLAlchemy()
 
+PERMISSION_CACHE_TTL = 300  # seconds
+ORG_USER_CACHE_TTL = 60  # seconds
+CATALOG_CACHE_TTL = 600  # seconds
+PERMISSION_CATALOG_CACHE_KEY = 'perm:catalog:v1'
+
+def orjson_response(payload, status=200):
+    """Serialize a payload with orjson into a JSON response"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+def columns_of(model):
+    """All mapped columns of a model, for selecting plain rows instead of ORM objects"""
+    return tuple(model.__table__.columns)
+
+def row_to_dict(row):
+    """Serialize a column row the same way the model's to_dict would"""
+    data = {}
+    for key, value in row._mapping.items():
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, PyEnum):
+            value = value.value
+        data[key] = value
+    return data
+
+# The module-level db above is never bound to an app, so the writer uses the app's instance.
+# Enterprise models live on their own declarative Base that db.create_all() doesn't cover;
+# until audit_logs is created by hand, every audit write is logged and dropped.
+audit_buffer = AuditLogBuffer(
+    app_db,
+    batch_size=int(os.getenv('AUDIT_LOG_BUFFER_SIZE', 500)),
+    flush_interval=int(os.getenv('AUDIT_LOG_BUFFER_TIME_MS', 100)) / 1000
+)
+
 def organization_required(f):
     """Decorator to ensure user belongs to an organization"""
     @wraps(f)
@@ -26,12 +72,7 @@ def organization_required(f):
             return jsonify({'error': 'Organization ID required'}), 400
         
         # Verify user has access to this organization
-        user_id = request.current_user['id']
-        org_user = OrganizationUser.query.filter_by(
-            user_id=user_id,
-            organization_id=org_id,
-            is_active=True
-        ).first()
+        org_user = load_org_user(request.current_user['id'], org_id)
         
         if not org_user:
             return jsonify({'error': 'Access denied to organization'}), 403
@@ -42,28 +83,82 @@ def organization_required(f):
     
     return decorated_function
 
+def org_user_cache_key(user_id, org_id):
+    """Redis key mapping a user's membership in an organization to its OrganizationUser id"""
+    return f"orguser:{user_id}:{org_id}"
+
+def load_org_user(user_id, org_id):
+    """Resolve the active OrganizationUser for this request, memoized on g and in Redis"""
+    org_user = g.get('current_org_user')
+    if org_user is not None and org_user.organization_id == org_id and org_user.user_id == str(user_id):
+        return org_user
+    
+    query = OrganizationUser.query.options(joinedload(OrganizationUser.organization))
+    cache_key = org_user_cache_key(user_id, org_id)
+    
+    org_user = None
+    cached_id = cache_get(cache_key)
+    if cached_id is not None:
+        org_user = query.filter_by(id=cached_id.decode(), is_active=True).first()
+    
+    if org_user is None:
+        org_user = query.filter_by(
+            user_id=user_id,
+            organization_id=org_id,
+            is_active=True
+        ).first()
+        if org_user:
+            cache_set(cache_key, org_user.id, ORG_USER_CACHE_TTL)
+    
+    g.current_org_user = org_user
+    return org_user
+
 def permission_required(resource, action):
     """Decorator to check specific permissions"""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not hasattr(request, 'current_org_user'):
+            org_user = g.get('current_org_user') or getattr(request, 'current_org_user', None)
+            if org_user is None:
                 return jsonify({'error': 'Organization context required'}), 400
             
             # Check if user has required permission
-            if not has_permission(request.current_org_user, resource, action):
+            if not has_permission(org_user, resource, action):
                 return jsonify({'error': 'Insufficient permissions'}), 403
             
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
+def permission_cache_key(org_user, resource, action):
+    """Redis key for a cached permission check"""
+    return f"perm:{org_user.organization_id}:{org_user.id}:{resource}:{action}"
+
 def has_permission(org_user, resource, action):
-    """Check if organization user has specific permission"""
+    """Check if organization user has specific permission, caching the result in Redis"""
     # System admins have all permissions
     if org_user.role == 'admin':
         return True
     
+    # Repeat checks within one request are answered from g without touching Redis
+    request_cache = g.setdefault('_perm_cache', {})
+    memo_key = (org_user.id, resource, action)
+    if memo_key in request_cache:
+        return request_cache[memo_key]
+    
+    cache_key = permission_cache_key(org_user, resource, action)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        allowed = cached == b'1'
+    else:
+        allowed = _check_permission(org_user, resource, action)
+        cache_set(cache_key, b'1' if allowed else b'0', PERMISSION_CACHE_TTL)
+    
+    request_cache[memo_key] = allowed
+    return allowed
+
+def _check_permission(org_user, resource, action):
+    """Resolve a permission check against the database"""
     # Check user's direct permissions
     for perm in org_user.permissions:
         if perm.get('resource') == resource and perm.get('action') == action:
@@ -75,16 +170,15 @@ def has_permission(org_user, resource, action):
         name=org_user.role
     ).first()
     
-    if role:
-        for perm_id in role.permissions:
-            permission = Permission.query.get(perm_id)
-            if permission and permission.resource == resource and permission.action.value == action:
-                return True
+    if role and role.permissions:
+        permissions = Permission.query.filter(Permission.id.in_(role.permissions)).all()
+        if any(p.resource == resource and p.action.value == action for p in permissions):
+            return True
     
     return False
 
 def log_audit_event(action, resource_type, resource_id=None, details=None):
-    """Log audit event"""
+    """Queue an audit event for the buffered writer"""
     try:
         audit_log = AuditLog(
             organization_id=request.current_organization.id,
@@ -94,12 +188,20 @@ def log_audit_event(action, resource_type, resource_id=None, details=None):
             resource_id=resource_id,
             details=details or {},
             ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent', '')
+            user_agent=request.headers.get('User-Agent', ''),
+            timestamp=datetime.utcnow()
         )
-        db.session.add(audit_log)
-        db.session.commit()
+        # Written in batches by the background audit writer
+        audit_buffer.put(current_app._get_current_object(), audit_log)
     except Exception as e:
-        print(f"Failed to log audit event: {e}")
+        get_failure_logger().error(f"Failed to log audit event: {e}")
+
+def _active_count(model, org_id):
+    """Scalar subquery counting an organization's active rows in a table"""
+    return select(func.count()).select_from(model).where(
+        model.organization_id == org_id,
+        model.is_active.is_(True)
+    ).scalar_subquery()
 
 # Organization Management
 @enterprise_bp.route('/organizations', methods=['GET'])
@@ -109,7 +211,9 @@ def get_organizations():
     try:
         user_id = request.current_user['id']
         
-        org_users = OrganizationUser.query.filter_by(
+        org_users = OrganizationUser.query.options(
+            joinedload(OrganizationUser.organization)
+        ).filter_by(
             user_id=user_id,
             is_active=True
         ).all()
@@ -143,11 +247,6 @@ def create_organization():
         # Generate slug from name
         slug = data['name'].lower().replace(' ', '-').replace('_', '-')
         
-        # Check if slug already exists
-        existing_org = Organization.query.filter_by(slug=slug).first()
-        if existing_org:
-            slug = f"{slug}-{uuid.uuid4().hex[:8]}"
-        
         # Create organization
         organization = Organization(
             name=data['name'],
@@ -159,8 +258,15 @@ def create_organization():
             settings=data.get('settings', {})
         )
         
+        # Insert optimistically and let the unique index on slug detect collisions
         db.session.add(organization)
-        db.session.flush()  # Get the ID
+        try:
+            db.session.flush()  # Get the ID
+        except IntegrityError:
+            db.session.rollback()
+            organization.slug = f"{slug}-{uuid.uuid4().hex[:8]}"
+            db.session.add(organization)
+            db.session.flush()
         
         # Add current user as admin
         org_user = OrganizationUser(
@@ -198,21 +304,13 @@ def get_organization(org_id):
     try:
         organization = request.current_organization
         
-        # Get additional stats
-        stats = {
-            'total_users': OrganizationUser.query.filter_by(
-                organization_id=org_id,
-                is_active=True
-            ).count(),
-            'total_teams': Team.query.filter_by(
-                organization_id=org_id,
-                is_active=True
-            ).count(),
-            'total_locations': BusinessLocation.query.filter_by(
-                organization_id=org_id,
-                is_active=True
-            ).count()
-        }
+        # Get additional stats, counting all three tables in one round trip
+        stats_row = db.session.execute(select(
+            _active_count(OrganizationUser, org_id).label('total_users'),
+            _active_count(Team, org_id).label('total_teams'),
+            _active_count(BusinessLocation, org_id).label('total_locations')
+        )).one()
+        stats = dict(stats_row._mapping)
         
         org_data = organization.to_dict()
         org_data['stats'] = stats
@@ -273,18 +371,27 @@ def update_organization(org_id):
 def get_teams(org_id):
     """Get teams for organization"""
     try:
-        teams = Team.query.filter_by(
+        teams = db.session.query(*columns_of(Team)).filter_by(
             organization_id=org_id,
             is_active=True
         ).all()
         
+        # Count members for all teams in a single grouped query
+        team_ids = [team.id for team in teams]
+        member_counts = dict(
+            db.session.query(TeamMember.team_id, func.count(TeamMember.id))
+            .filter(TeamMember.team_id.in_(team_ids))
+            .group_by(TeamMember.team_id)
+            .all()
+        ) if team_ids else {}
+        
         teams_data = []
         for team in teams:
-            team_data = team.to_dict()
-            team_data['member_count'] = TeamMember.query.filter_by(team_id=team.id).count()
+            team_data = row_to_dict(team)
+            team_data['member_count'] = member_counts.get(team.id, 0)
             teams_data.append(team_data)
         
-        return jsonify({
+        return orjson_response({
             'teams': teams_data,
             'total': len(teams_data)
         })
@@ -339,23 +446,30 @@ def create_team(org_id):
 def get_organization_users(org_id):
     """Get users for organization"""
     try:
-        org_users = OrganizationUser.query.filter_by(
+        org_users = db.session.query(*columns_of(OrganizationUser)).filter_by(
             organization_id=org_id,
             is_active=True
         ).all()
         
+        # Load all matching auth users in one query; OrganizationUser.user_id
+        # is stored as a string, so key the lookup by str(id)
+        user_ids = [org_user.user_id for org_user in org_users]
+        auth_users = {
+            str(auth_user.id): auth_user
+            for auth_user in AuthUser.query.filter(AuthUser.id.in_(user_ids)).all()
+        } if user_ids else {}
+        
         users_data = []
         for org_user in org_users:
-            # Get user details from AuthUser
-            auth_user = AuthUser.query.get(org_user.user_id)
+            auth_user = auth_users.get(str(org_user.user_id))
             if auth_user:
-                user_data = org_user.to_dict()
+                user_data = row_to_dict(org_user)
                 user_data['email'] = auth_user.email
                 user_data['full_name'] = auth_user.full_name
                 user_data['last_login'] = auth_user.last_login.isoformat() if auth_user.last_login else None
                 users_data.append(user_data)
         
-        return jsonify({
+        return orjson_response({
             'users': users_data,
             'total': len(users_data)
         })
@@ -388,6 +502,9 @@ def update_user_role(org_id, user_id):
         org_user.role = new_role
         
         db.session.commit()
+        cache_delete_pattern(f"perm:{org_id}:{org_user.id}:*")
+        cache_delete(org_user_cache_key(org_user.user_id, org_id))
+        g.pop('_perm_cache', None)
         
         # Log audit event
         log_audit_event(
@@ -412,14 +529,24 @@ def update_user_role(org_id, user_id):
 def get_permissions():
     """Get all available permissions"""
     try:
+        cached = cache_get(PERMISSION_CATALOG_CACHE_KEY)
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+        
         permissions = Permission.query.all()
-        return jsonify({
+        payload = orjson.dumps({
             'permissions': [perm.to_dict() for perm in permissions]
         })
+        cache_set(PERMISSION_CATALOG_CACHE_KEY, payload, CATALOG_CACHE_TTL)
+        return Response(payload, mimetype='application/json')
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def roles_cache_key(org_id):
+    """Cache key for an organization's role list"""
+    return f"roles:{org_id}:v1"
+
 @enterprise_bp.route('/organizations/<org_id>/roles', methods=['GET'])
 @token_required
 @organization_required
@@ -427,15 +554,34 @@ def get_permissions():
 def get_roles(org_id):
     """Get roles for organization"""
     try:
+        cached = cache_get(roles_cache_key(org_id))
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+        
         roles = Role.query.filter_by(organization_id=org_id).all()
-        return jsonify({
+        payload = orjson.dumps({
             'roles': [role.to_dict() for role in roles]
         })
+        cache_set(roles_cache_key(org_id), payload, CATALOG_CACHE_TTL)
+        return Response(payload, mimetype='application/json')
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Audit Logs
+def encode_audit_cursor(audit_log):
+    """Encode the keyset position of an audit log row as an opaque cursor"""
+    raw = json.dumps([audit_log.timestamp.isoformat(), audit_log.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_audit_cursor(cursor):
+    """Decode a cursor into its (timestamp, id) pair, raising ValueError if malformed"""
+    try:
+        timestamp, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), str(log_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError('Invalid audit log cursor') from e
+
 @enterprise_bp.route('/organizations/<org_id>/audit-logs', methods=['GET'])
 @token_required
 @organization_required
@@ -443,8 +589,8 @@ def get_roles(org_id):
 def get_audit_logs(org_id):
     """Get audit logs for organization"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
+        per_page = max(1, min(request.args.get('per_page', 50, type=int), 1000))
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
         
         # Filter parameters
         action = request.args.get('action')
@@ -452,6 +598,13 @@ def get_audit_logs(org_id):
         user_id = request.args.get('user_id')
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        cursor = request.args.get('cursor')
+        
+        # Clients still sending ?page= without a cursor get the old OFFSET paging, with total and pages
+        page = None if cursor else request.args.get('page', type=int)
+        if page is not None:
+            page = max(1, page)
+            include_total = True
         
         query = AuditLog.query.filter_by(organization_id=org_id)
         
@@ -466,19 +619,56 @@ def get_audit_logs(org_id):
         if end_date:
             query = query.filter(AuditLog.timestamp <= datetime.fromisoformat(end_date))
         
-        query = query.order_by(AuditLog.timestamp.desc())
-        
-        # Paginate
-        audit_logs = query.offset((page - 1) * per_page).limit(per_page).all()
-        total = query.count()
-        
-        return jsonify({
-            'audit_logs': [log.to_dict() for log in audit_logs],
-            'total': total,
-            'page': page,
-            'per_page': per_page,
-            'pages': (total + per_page - 1) // per_page
-        })
+        # Counting the whole filtered set is opt-in; the page itself never needs it
+        total = None
+        if include_total:
+            total = query.with_entities(func.count(AuditLog.id)).order_by(None).scalar()
+        
+        # Keyset pagination: seek past the last (timestamp, id) seen instead of OFFSET
+        if cursor:
+            try:
+                before_ts, before_id = decode_audit_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.filter(tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(before_ts, before_id))
+        
+        rows = iter(query.with_entities(*columns_of(AuditLog))
+                    .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+                    .offset((page - 1) * per_page if page is not None else None)
+                    .limit(per_page + 1)
+                    .yield_per(200))
+        
+        # Run the query before streaming starts, so a database error is still answered with a 500 below
+        first = next(rows, None)
+        if first is not None:
+            rows = chain((first,), rows)
+        
+        def generate():
+            # Rows are encoded one at a time, so memory stays flat regardless of per_page
+            yield b'{"audit_logs":['
+            last = None
+            has_more = False
+            for count, log in enumerate(rows):
+                if count == per_page:
+                    has_more = True
+                    break
+                if last is not None:
+                    yield b','
+                yield orjson.dumps(row_to_dict(log))
+                last = log
+            
+            trailer = {
+                'per_page': per_page,
+                'next_cursor': encode_audit_cursor(last) if has_more else None
+            }
+            if include_total:
+                trailer['total'] = total
+            if page is not None:
+                trailer['page'] = page
+                trailer['pages'] = (total + per_page - 1) // per_page
+            yield b'],' + orjson.dumps(trailer)[1:]
+        
+        return Response(stream_with_context(generate()), mimetype='application/json')
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -553,13 +743,13 @@ def update_whitelabel_config(org_id):
 def get_business_locations(org_id):
     """Get business locations for organization"""
     try:
-        locations = BusinessLocation.query.filter_by(
+        locations = db.session.query(*columns_of(BusinessLocation)).filter_by(
             organization_id=org_id,
             is_active=True
         ).all()
         
-        return jsonify({
-            'locations': [location.to_dict() for location in locations],
+        return orjson_response({
+            'locations': [row_to_dict(location) for location in locations],
             'total': len(locations)
         })
     
@@ -613,6 +803,45 @@ def create_business_location(org_id):
         return jsonify({'error': str(e)}), 500
 
 # Initialize default permissions
+# Default permission catalog, seeded by init_default_permissions
+_DEFAULT_PERMISSIONS = (
+    # Reviews
+    {'name': 'reviews.read', 'resource': 'reviews', 'action': PermissionType.READ, 'description': 'View reviews'},
+    {'name': 'reviews.write', 'resource': 'reviews', 'action': PermissionType.WRITE, 'description': 'Create and edit reviews'},
+    {'name': 'reviews.delete', 'resource': 'reviews', 'action': PermissionType.DELETE, 'description': 'Delete reviews'},
+
+    # Analytics
+    {'name': 'analytics.read', 'resource': 'analytics', 'action': PermissionType.READ, 'description': 'View analytics'},
+    {'name': 'analytics.export', 'resource': 'analytics', 'action': PermissionType.WRITE, 'description': 'Export analytics data'},
+
+    # Users
+    {'name': 'users.read', 'resource': 'users', 'action': PermissionType.READ, 'description': 'View users'},
+    {'name': 'users.write', 'resource': 'users', 'action': PermissionType.WRITE, 'description': 'Manage users'},
+    {'name': 'users.delete', 'resource': 'users', 'action': PermissionType.DELETE, 'description': 'Remove users'},
+
+    # Teams
+    {'name': 'teams.read', 'resource': 'teams', 'action': PermissionType.READ, 'description': 'View teams'},
+    {'name': 'teams.write', 'resource': 'teams', 'action': PermissionType.WRITE, 'description': 'Manage teams'},
+    {'name': 'teams.delete', 'resource': 'teams', 'action': PermissionType.DELETE, 'description': 'Delete teams'},
+
+    # Organization
+    {'name': 'organization.read', 'resource': 'organization', 'action': PermissionType.READ, 'description': 'View organization settings'},
+    {'name': 'organization.write', 'resource': 'organization', 'action': PermissionType.WRITE, 'description': 'Manage organization settings'},
+
+    # Audit
+    {'name': 'audit.read', 'resource': 'audit', 'action': PermissionType.READ, 'description': 'View audit logs'},
+
+    # Branding
+    {'name': 'branding.read', 'resource': 'branding', 'action': PermissionType.READ, 'description': 'View branding settings'},
+    {'name': 'branding.write', 'resource': 'branding', 'action': PermissionType.WRITE, 'description': 'Manage branding settings'},
+
+    # Locations
+    {'name': 'locations.read', 'resource': 'locations', 'action': PermissionType.READ, 'description': 'View business locations'},
+    {'name': 'locations.write', 'resource': 'locations', 'action': PermissionType.WRITE, 'description': 'Manage business locations'},
+    {'name': 'locations.delete', 'resource': 'locations', 'action': PermissionType.DELETE, 'description': 'Delete business locations'},
+)
+_DEFAULT_PERM_NAMES = frozenset(perm['name'] for perm in _DEFAULT_PERMISSIONS)
+
 @enterprise_bp.route('/admin/init-permissions', methods=['POST'])
 @token_required
 def init_default_permissions():
@@ -623,56 +852,29 @@ def init_default_permissions():
         if not user or user.role != UserRole.ADMIN:
             return jsonify({'error': 'Admin access required'}), 403
         
-        default_permissions = [
-            # Reviews
-            {'name': 'reviews.read', 'resource': 'reviews', 'action': PermissionType.READ, 'description': 'View reviews'},
-            {'name': 'reviews.write', 'resource': 'reviews', 'action': PermissionType.WRITE, 'description': 'Create and edit reviews'},
-            {'name': 'reviews.delete', 'resource': 'reviews', 'action': PermissionType.DELETE, 'description': 'Delete reviews'},
-            
-            # Analytics
-            {'name': 'analytics.read', 'resource': 'analytics', 'action': PermissionType.READ, 'description': 'View analytics'},
-            {'name': 'analytics.export', 'resource': 'analytics', 'action': PermissionType.WRITE, 'description': 'Export analytics data'},
-            
-            # Users
-            {'name': 'users.read', 'resource': 'users', 'action': PermissionType.READ, 'description': 'View users'},
-            {'name': 'users.write', 'resource': 'users', 'action': PermissionType.WRITE, 'description': 'Manage users'},
-            {'name': 'users.delete', 'resource': 'users', 'action': PermissionType.DELETE, 'description': 'Remove users'},
-            
-            # Teams
-            {'name': 'teams.read', 'resource': 'teams', 'action': PermissionType.READ, 'description': 'View teams'},
-            {'name': 'teams.write', 'resource': 'teams', 'action': PermissionType.WRITE, 'description': 'Manage teams'},
-            {'name': 'teams.delete', 'resource': 'teams', 'action': PermissionType.DELETE, 'description': 'Delete teams'},
-            
-            # Organization
-            {'name': 'organization.read', 'resource': 'organization', 'action': PermissionType.READ, 'description': 'View organization settings'},
-            {'name': 'organization.write', 'resource': 'organization', 'action': PermissionType.WRITE, 'description': 'Manage organization settings'},
-            
-            # Audit
-            {'name': 'audit.read', 'resource': 'audit', 'action': PermissionType.READ, 'description': 'View audit logs'},
-            
-            # Branding
-            {'name': 'branding.read', 'resource': 'branding', 'action': PermissionType.READ, 'description': 'View branding settings'},
-            {'name': 'branding.write', 'resource': 'branding', 'action': PermissionType.WRITE, 'description': 'Manage branding settings'},
-            
-            # Locations
-            {'name': 'locations.read', 'resource': 'locations', 'action': PermissionType.READ, 'description': 'View business locations'},
-            {'name': 'locations.write', 'resource': 'locations', 'action': PermissionType.WRITE, 'description': 'Manage business locations'},
-            {'name': 'locations.delete', 'resource': 'locations', 'action': PermissionType.DELETE, 'description': 'Delete business locations'},
-        ]
-        
-        created_count = 0
-        for perm_data in default_permissions:
-            existing = Permission.query.filter_by(name=perm_data['name']).first()
-            if not existing:
-                permission = Permission(**perm_data)
-                db.session.add(permission)
-                created_count += 1
+        dialect = db.engine.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            # Single upsert-style seed: rows whose name already exists are skipped by the database
+            insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+            stmt = insert(Permission.__table__).values(list(_DEFAULT_PERMISSIONS)).on_conflict_do_nothing(
+                index_elements=['name']
+            )
+            created_count = db.session.execute(stmt).rowcount
+        else:
+            # No ON CONFLICT support: find existing names in one query, bulk insert the rest
+            existing = set(db.session.scalars(
+                select(Permission.name).where(Permission.name.in_(_DEFAULT_PERM_NAMES))
+            ))
+            missing = [perm for perm in _DEFAULT_PERMISSIONS if perm['name'] not in existing]
+            db.session.bulk_insert_mappings(Permission, missing)
+            created_count = len(missing)
         
         db.session.commit()
+        cache_delete_pattern("perm:*")
         
         return jsonify({
             'message': f'Initialized {created_count} default permissions',
-            'total_permissions': len(default_permissions)
+            'total_permissions': len(_DEFAULT_PERMISSIONS)
         })
     
     except Exception as e:
@@ -1,73 +1,189 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, current_app, stream_with_context
 from src.models.user import db
 from src.models.integrations import (
-    Integration, WebhookEndpoint, WebhookDelivery, APIKey, APIUsageLog,
+    Integration, WebhookEndpoint, WebhookDelivery, APIKey,
     IntegrationSyncLog, IntegrationType, IntegrationStatus, WebhookEventType,
     APIKeyScope, IntegrationManager
 )
 from src.models.auth import AuthUser
 from src.routes.auth import token_required
+from src.services.api_usage import usage_buffer
+from src.services.cache import cache_get, cache_set, cache_delete, cache_get_many, cache_set_many, get_redis
+from src.services.webhook_delivery import enqueue_delivery, get_delivery_status
+from werkzeug.local import LocalProxy
 from datetime import datetime, timedelta
 from sqlalchemy import func, desc
-import json
-import requests
+from sqlalchemy.orm import raiseload
+import orjson
 import hashlib
 import hmac
 from functools import wraps
+from itertools import chain
 
 integrations_bp = Blueprint('integrations', __name__)
 
+@integrations_bp.before_request
+def answer_preflight():
+    """Answer CORS preflight before any auth decorator or URL-method lookup runs"""
+    if request.method == 'OPTIONS':
+        # flask-cors still adds the Access-Control-* headers in after_request
+        return current_app.response_class(status=204)
+
+def orjson_response(payload, status=200):
+    """Serialize a payload with orjson into a JSON response"""
+    return current_app.response_class(orjson.dumps(payload), status=status, mimetype='application/json')
+
+def orjson_list_response(encoded_items):
+    """Wrap already-encoded list items in the standard success envelope"""
+    body = b'{"success":true,"data":[' + b','.join(encoded_items) + b']}'
+    return current_app.response_class(body, mimetype='application/json')
+
+API_KEY_CACHE_TTL = 60  # seconds
+REVIEW_COUNT_CACHE_KEY = 'reviews:count:all'
+REVIEW_COUNT_CACHE_TTL = 60  # seconds
+SERIALIZED_ROW_CACHE_TTL = 300  # seconds
+
+_VALID_WEBHOOK_EVENTS = frozenset(event.value for event in WebhookEventType)
+_VALID_API_SCOPES = frozenset(scope.value for scope in APIKeyScope)
+_INTEGRATION_TYPE_BY_VALUE = {integration_type.value: integration_type for integration_type in IntegrationType}
+_INTEGRATION_STATUS_BY_VALUE = {status.value: status for status in IntegrationStatus}
+
+def serialized_row_key(model, row_id, updated_at):
+    return f"row:{model.__tablename__}:{row_id}:{updated_at.isoformat()}"
+
+def serialize_rows(model, query):
+    """Encode to_dict() for each row of query, reusing encodings cached under (table, id, updated_at)"""
+    if get_redis() is None:
+        return [orjson.dumps(row.to_dict()) for row in query]
+    
+    # Any write bumps updated_at via the column's onupdate, so a stale key is simply never read again
+    stamps = query.with_entities(model.id, model.updated_at).all()
+    # Rows without an updated_at (written before the column had a default) have no stable key and are never cached
+    versioned = [(row_id, updated_at) for row_id, updated_at in stamps if updated_at is not None]
+    cached = cache_get_many([serialized_row_key(model, row_id, updated_at) for row_id, updated_at in versioned])
+    encoded = {row_id: data for (row_id, _), data in zip(versioned, cached) if data is not None}
+    
+    missing = [row_id for row_id, _ in stamps if row_id not in encoded]
+    if missing:
+        fresh = {}
+        for row in model.query.options(raiseload('*')).filter(model.id.in_(missing)):
+            encoded[row.id] = orjson.dumps(row.to_dict())
+            if row.updated_at is not None:
+                fresh[serialized_row_key(model, row.id, row.updated_at)] = encoded[row.id]
+        cache_set_many(fresh, SERIALIZED_ROW_CACHE_TTL)
+    
+    # Rows deleted between the two reads are dropped; order follows the first query
+    return [encoded[row_id] for row_id, _ in stamps if row_id in encoded]
+
+class CachedAPIKey:
+    """Detached snapshot of an active API key with what request authentication needs"""
+    
+    __slots__ = ('id', 'user_id', 'expires_at', 'scopes')
+    
+    def __init__(self, id, user_id, expires_at, scopes):
+        self.id = id
+        self.user_id = user_id
+        self.expires_at = expires_at
+        self.scopes = scopes
+    
+    @classmethod
+    def from_model(cls, api_key):
+        return cls(api_key.id, api_key.user_id, api_key.expires_at, api_key.get_scopes())
+    
+    @classmethod
+    def from_json(cls, raw):
+        data = orjson.loads(raw)
+        expires_at = datetime.fromisoformat(data['expires_at']) if data['expires_at'] else None
+        return cls(data['id'], data['user_id'], expires_at, data['scopes'])
+    
+    def to_json(self):
+        return orjson.dumps({
+            'id': self.id,
+            'user_id': self.user_id,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'scopes': self.scopes
+        })
+    
+    def is_expired(self):
+        """Check if API key is expired"""
+        if not self.expires_at:
+            return False
+        return datetime.utcnow() > self.expires_at
+    
+    def get_scopes(self):
+        """Get list of API key scopes"""
+        return self.scopes
+    
+    def has_any_scope(self, required_scopes):
+        """Check whether the key grants at least one of the required scopes"""
+        return not required_scopes.isdisjoint(self.scopes)
+
+def api_key_cache_key(key_hash):
+    """Redis key for a cached API key lookup"""
+    return f"apikey:{key_hash}"
+
+def load_api_key(key_hash):
+    """Look up an active API key by hash, served from Redis when cached"""
+    cache_key = api_key_cache_key(key_hash)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return CachedAPIKey.from_json(cached)
+    
+    api_key_obj = APIKey.query.filter_by(key_hash=key_hash, is_active=True).first()
+    if not api_key_obj:
+        return None
+    
+    snapshot = CachedAPIKey.from_model(api_key_obj)
+    cache_set(cache_key, snapshot.to_json(), API_KEY_CACHE_TTL)
+    return snapshot
+
+# Auth failure bodies are encoded once; a fresh Response is still built per request
+# because after_request hooks (CORS) mutate response headers
+_API_KEY_REQUIRED_BODY = orjson.dumps({'success': False, 'message': 'API key required'})
+_INVALID_API_KEY_BODY = orjson.dumps({'success': False, 'message': 'Invalid or expired API key'})
+_INSUFFICIENT_SCOPE_BODY = orjson.dumps({'success': False, 'message': 'Insufficient API key permissions'})
+
+def _error_response(body, status):
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
 # API Key authentication decorator
 def api_key_required(scopes=None):
     """Decorator to require API key authentication"""
+    required_scopes = frozenset(scopes or ())
+    
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
             
             if not api_key:
-                return jsonify({
-                    'success': False,
-                    'message': 'API key required'
-                }), 401
+                return _error_response(_API_KEY_REQUIRED_BODY, 401)
             
             # Find and verify API key
             key_hash = hashlib.sha256(api_key.encode()).hexdigest()
-            api_key_obj = APIKey.query.filter_by(key_hash=key_hash, is_active=True).first()
+            api_key_obj = load_api_key(key_hash)
             
             if not api_key_obj or api_key_obj.is_expired():
-                return jsonify({
-                    'success': False,
-                    'message': 'Invalid or expired API key'
-                }), 401
+                return _error_response(_INVALID_API_KEY_BODY, 401)
             
             # Check scopes if required
-            if scopes:
-                user_scopes = api_key_obj.get_scopes()
-                if not any(scope in user_scopes for scope in scopes):
-                    return jsonify({
-                        'success': False,
-                        'message': 'Insufficient API key permissions'
-                    }), 403
-            
-            # Update usage
-            api_key_obj.total_requests += 1
-            api_key_obj.last_used_at = datetime.utcnow()
+            if required_scopes and not api_key_obj.has_any_scope(required_scopes):
+                return _error_response(_INSUFFICIENT_SCOPE_BODY, 403)
             
-            # Log API usage
-            usage_log = APIUsageLog(
-                api_key_id=api_key_obj.id,
-                endpoint=request.endpoint,
-                method=request.method,
-                ip_address=request.remote_addr,
-                user_agent=request.headers.get('User-Agent', '')[:500]
-            )
-            db.session.add(usage_log)
-            db.session.commit()
+            # Record usage; the log row and counter update are written by a background thread
+            usage_buffer.put(current_app._get_current_object(), {
+                'api_key_id': api_key_obj.id,
+                'endpoint': request.endpoint,
+                'method': request.method,
+                'ip_address': request.remote_addr,
+                'user_agent': request.headers.get('User-Agent', '')[:500],
+                'created_at': datetime.utcnow()
+            })
             
             # Add API key and user to request context
             request.api_key = api_key_obj
-            request.current_user = api_key_obj.user
+            user_id = api_key_obj.user_id
+            request.current_user = LocalProxy(lambda: db.session.get(AuthUser, user_id))
             
             return f(*args, **kwargs)
         return decorated_function
@@ -81,20 +197,23 @@ def get_integrations(current_user):
     """Get all integrations for the current user"""
     try:
         integration_type = request.args.get('type')
-        integrations = IntegrationManager.get_user_integrations(
-            current_user.id, 
-            IntegrationType(integration_type) if integration_type else None
-        )
+        integration_type_enum = None
+        if integration_type:
+            integration_type_enum = _INTEGRATION_TYPE_BY_VALUE.get(integration_type)
+            if integration_type_enum is None:
+                return orjson_response({
+                    'success': False,
+                    'message': 'Invalid integration type'
+                }, 400)
         
-        return jsonify({
-            'success': True,
-            'data': [integration.to_dict() for integration in integrations]
-        })
+        query = IntegrationManager.user_integrations_query(current_user.id, integration_type_enum)
+        
+        return orjson_list_response(serialize_rows(Integration, query))
     except Exception as e:
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error fetching integrations: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/integrations', methods=['POST'])
 @token_required
@@ -107,24 +226,23 @@ def create_integration(current_user):
         config_data = data.get('config_data', {})
         
         if not name or not integration_type:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Name and integration type are required'
-            }), 400
+            }, 400)
         
-        try:
-            integration_type_enum = IntegrationType(integration_type)
-        except ValueError:
-            return jsonify({
+        integration_type_enum = _INTEGRATION_TYPE_BY_VALUE.get(integration_type)
+        if integration_type_enum is None:
+            return orjson_response({
                 'success': False,
                 'message': 'Invalid integration type'
-            }), 400
+            }, 400)
         
         integration = IntegrationManager.create_integration(
             current_user.id, name, integration_type_enum, config_data
         )
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'data': integration.to_dict(),
             'message': 'Integration created successfully'
@@ -132,12 +250,12 @@ def create_integration(current_user):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error creating integration: {str(e)}'
-        }), 500
+        }, 500)
 
-@integrations_bp.route('/integrations/<int:integration_id>', methods=['PUT'])
+@integrations_bp.route('/integrations/<int:integration_id>', methods=['PUT', 'PATCH'])
 @token_required
 def update_integration(current_user, integration_id):
     """Update an integration"""
@@ -148,10 +266,10 @@ def update_integration(current_user, integration_id):
         ).first()
         
         if not integration:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Integration not found'
-            }), 404
+            }, 404)
         
         data = request.get_json()
         
@@ -160,18 +278,18 @@ def update_integration(current_user, integration_id):
         if 'config_data' in data:
             integration.set_config(data['config_data'])
         if 'status' in data:
-            try:
-                integration.status = IntegrationStatus(data['status'])
-            except ValueError:
-                return jsonify({
+            status = _INTEGRATION_STATUS_BY_VALUE.get(data['status'])
+            if status is None:
+                return orjson_response({
                     'success': False,
                     'message': 'Invalid status'
-                }), 400
+                }, 400)
+            integration.status = status
         
-        integration.updated_at = datetime.utcnow()
+        # updated_at is set by the column's onupdate in the same UPDATE statement
         db.session.commit()
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'data': integration.to_dict(),
             'message': 'Integration updated successfully'
@@ -179,10 +297,10 @@ def update_integration(current_user, integration_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error updating integration: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/integrations/<int:integration_id>', methods=['DELETE'])
 @token_required
@@ -195,25 +313,25 @@ def delete_integration(current_user, integration_id):
         ).first()
         
         if not integration:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Integration not found'
-            }), 404
+            }, 404)
         
         db.session.delete(integration)
         db.session.commit()
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'message': 'Integration deleted successfully'
         })
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error deleting integration: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/integrations/<int:integration_id>/test', methods=['POST'])
 @token_required
@@ -226,19 +344,19 @@ def test_integration(current_user, integration_id):
         ).first()
         
         if not integration:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Integration not found'
-            }), 404
+            }, 404)
         
         result = IntegrationManager.test_integration(integration_id)
-        return jsonify(result)
+        return orjson_response(result)
         
     except Exception as e:
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error testing integration: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/integrations/<int:integration_id>/sync', methods=['POST'])
 @token_required
@@ -251,19 +369,19 @@ def sync_integration(current_user, integration_id):
         ).first()
         
         if not integration:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Integration not found'
-            }), 404
+            }, 404)
         
         result = IntegrationManager.sync_integration(integration_id, 'manual')
-        return jsonify(result)
+        return orjson_response(result)
         
     except Exception as e:
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error syncing integration: {str(e)}'
-        }), 500
+        }, 500)
 
 # Webhook Management Routes
 
@@ -272,17 +390,14 @@ def sync_integration(current_user, integration_id):
 def get_webhooks(current_user):
     """Get all webhook endpoints for the current user"""
     try:
-        webhooks = WebhookEndpoint.query.filter_by(user_id=current_user.id).all()
+        query = WebhookEndpoint.query.options(raiseload('*')).filter_by(user_id=current_user.id)
         
-        return jsonify({
-            'success': True,
-            'data': [webhook.to_dict() for webhook in webhooks]
-        })
+        return orjson_list_response(serialize_rows(WebhookEndpoint, query))
     except Exception as e:
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error fetching webhooks: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/webhooks', methods=['POST'])
 @token_required
@@ -295,19 +410,18 @@ def create_webhook(current_user):
         events = data.get('events', [])
         
         if not name or not url:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Name and URL are required'
-            }), 400
+            }, 400)
         
         # Validate events
-        valid_events = [event.value for event in WebhookEventType]
-        invalid_events = [event for event in events if event not in valid_events]
+        invalid_events = [event for event in events if event not in _VALID_WEBHOOK_EVENTS]
         if invalid_events:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': f'Invalid events: {invalid_events}'
-            }), 400
+            }, 400)
         
         webhook = WebhookEndpoint(
             user_id=current_user.id,
@@ -321,7 +435,7 @@ def create_webhook(current_user):
         db.session.add(webhook)
         db.session.commit()
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'data': webhook.to_dict(),
             'message': 'Webhook created successfully'
@@ -329,12 +443,12 @@ def create_webhook(current_user):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error creating webhook: {str(e)}'
-        }), 500
+        }, 500)
 
-@integrations_bp.route('/webhooks/<int:webhook_id>', methods=['PUT'])
+@integrations_bp.route('/webhooks/<int:webhook_id>', methods=['PUT', 'PATCH'])
 @token_required
 def update_webhook(current_user, webhook_id):
     """Update a webhook endpoint"""
@@ -345,10 +459,10 @@ def update_webhook(current_user, webhook_id):
         ).first()
         
         if not webhook:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Webhook not found'
-            }), 404
+            }, 404)
         
         data = request.get_json()
         
@@ -365,10 +479,10 @@ def update_webhook(current_user, webhook_id):
         if 'retry_delay' in data:
             webhook.retry_delay = data['retry_delay']
         
-        webhook.updated_at = datetime.utcnow()
+        # updated_at is set by the column's onupdate in the same UPDATE statement
         db.session.commit()
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'data': webhook.to_dict(),
             'message': 'Webhook updated successfully'
@@ -376,10 +490,10 @@ def update_webhook(current_user, webhook_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error updating webhook: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/webhooks/<int:webhook_id>/test', methods=['POST'])
 @token_required
@@ -392,10 +506,10 @@ def test_webhook(current_user, webhook_id):
         ).first()
         
         if not webhook:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Webhook not found'
-            }), 404
+            }, 404)
         
         # Send test payload
         test_payload = {
@@ -407,44 +521,54 @@ def test_webhook(current_user, webhook_id):
             }
         }
         
-        payload_json = json.dumps(test_payload)
-        signature = webhook.generate_signature(payload_json)
+        # Serialize once; the same bytes are signed and sent
+        payload_json = orjson.dumps(test_payload)
         
+        # Receivers still checking the old scheme keep reading X-Webhook-Signature while they move to the HMAC header
         headers = {
             'Content-Type': 'application/json',
-            'X-Webhook-Signature': signature,
+            'X-Webhook-Signature': webhook.generate_legacy_signature(payload_json),
+            'X-Webhook-Signature-256': webhook.generate_signature(payload_json),
             'User-Agent': 'ReviewAssist-Webhook/1.0'
         }
         
-        try:
-            response = requests.post(
-                webhook.url, 
-                data=payload_json, 
-                headers=headers, 
-                timeout=10
-            )
-            
-            return jsonify({
-                'success': True,
-                'message': 'Test webhook sent successfully',
-                'response': {
-                    'status_code': response.status_code,
-                    'response_time_ms': int(response.elapsed.total_seconds() * 1000),
-                    'headers': dict(response.headers)
-                }
-            })
-            
-        except requests.exceptions.RequestException as e:
-            return jsonify({
-                'success': False,
-                'message': f'Webhook test failed: {str(e)}'
-            }), 400
+        task_id = enqueue_delivery(
+            current_user.id,
+            webhook.url,
+            payload_json,
+            headers,
+            max_retries=webhook.max_retries or 1
+        )
+        
+        return orjson_response({
+            'success': True,
+            'message': 'Test webhook queued for delivery',
+            'status': 'queued',
+            'task_id': task_id
+        }, 202)
         
     except Exception as e:
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error testing webhook: {str(e)}'
-        }), 500
+        }, 500)
+
+@integrations_bp.route('/webhooks/deliveries/<task_id>', methods=['GET'])
+@token_required
+def get_webhook_delivery(current_user, task_id):
+    """Get the status of a queued webhook delivery"""
+    delivery = get_delivery_status(task_id, current_user.id)
+    
+    if not delivery:
+        return orjson_response({
+            'success': False,
+            'message': 'Delivery not found'
+        }, 404)
+    
+    return orjson_response({
+        'success': True,
+        'data': delivery
+    })
 
 # API Key Management Routes
 
@@ -453,17 +577,14 @@ def test_webhook(current_user, webhook_id):
 def get_api_keys(current_user):
     """Get all API keys for the current user"""
     try:
-        api_keys = APIKey.query.filter_by(user_id=current_user.id).all()
+        query = APIKey.query.options(raiseload('*')).filter_by(user_id=current_user.id)
         
-        return jsonify({
-            'success': True,
-            'data': [api_key.to_dict() for api_key in api_keys]
-        })
+        return orjson_list_response(serialize_rows(APIKey, query))
     except Exception as e:
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error fetching API keys: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/api-keys', methods=['POST'])
 @token_required
@@ -475,19 +596,18 @@ def create_api_key(current_user):
         scopes = data.get('scopes', [])
         
         if not name:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'Name is required'
-            }), 400
+            }, 400)
         
         # Validate scopes
-        valid_scopes = [scope.value for scope in APIKeyScope]
-        invalid_scopes = [scope for scope in scopes if scope not in valid_scopes]
+        invalid_scopes = [scope for scope in scopes if scope not in _VALID_API_SCOPES]
         if invalid_scopes:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': f'Invalid scopes: {invalid_scopes}'
-            }), 400
+            }, 400)
         
         api_key = APIKey(
             user_id=current_user.id,
@@ -501,7 +621,7 @@ def create_api_key(current_user):
         db.session.add(api_key)
         db.session.commit()
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'data': api_key.to_dict(include_key=True),
             'message': 'API key created successfully. Save the key securely - it will not be shown again.'
@@ -509,12 +629,12 @@ def create_api_key(current_user):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error creating API key: {str(e)}'
-        }), 500
+        }, 500)
 
-@integrations_bp.route('/api-keys/<int:key_id>', methods=['PUT'])
+@integrations_bp.route('/api-keys/<int:key_id>', methods=['PUT', 'PATCH'])
 @token_required
 def update_api_key(current_user, key_id):
     """Update an API key"""
@@ -525,10 +645,10 @@ def update_api_key(current_user, key_id):
         ).first()
         
         if not api_key:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'API key not found'
-            }), 404
+            }, 404)
         
         data = request.get_json()
         
@@ -543,10 +663,11 @@ def update_api_key(current_user, key_id):
         if 'rate_limit_per_day' in data:
             api_key.rate_limit_per_day = data['rate_limit_per_day']
         
-        api_key.updated_at = datetime.utcnow()
+        # updated_at is set by the column's onupdate in the same UPDATE statement
         db.session.commit()
+        cache_delete(api_key_cache_key(api_key.key_hash))
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'data': api_key.to_dict(),
             'message': 'API key updated successfully'
@@ -554,10 +675,10 @@ def update_api_key(current_user, key_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error updating API key: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/api-keys/<int:key_id>', methods=['DELETE'])
 @token_required
@@ -570,25 +691,26 @@ def delete_api_key(current_user, key_id):
         ).first()
         
         if not api_key:
-            return jsonify({
+            return orjson_response({
                 'success': False,
                 'message': 'API key not found'
-            }), 404
+            }, 404)
         
         db.session.delete(api_key)
         db.session.commit()
+        cache_delete(api_key_cache_key(api_key.key_hash))
         
-        return jsonify({
+        return orjson_response({
             'success': True,
             'message': 'API key deleted successfully'
         })
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error deleting API key: {str(e)}'
-        }), 500
+        }, 500)
 
 # Public API Routes (using API key authentication)
 
@@ -604,37 +726,62 @@ def api_get_reviews():
         offset = int(request.args.get('offset', 0))
         platform = request.args.get('platform')
         rating = request.args.get('rating')
+        rating_int = int(rating) if rating else None
         
         # Build query
-        query = Review.query
+        query = Review.query.options(raiseload('*'))
         
         if platform:
             query = query.filter(Review.platform == platform)
-        if rating:
-            query = query.filter(Review.rating == int(rating))
+        if rating_int is not None:
+            query = query.filter(Review.rating == rating_int)
         
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination
-        reviews = query.offset(offset).limit(limit).all()
+        pagination = {
+            'limit': limit,
+            'offset': offset
+        }
         
-        return jsonify({
-            'success': True,
-            'data': [review.to_dict() for review in reviews],
-            'pagination': {
-                'total': total,
-                'limit': limit,
-                'offset': offset,
-                'has_more': offset + limit < total
-            }
-        })
+        # The exact total is opt-in; the unfiltered count is cached briefly
+        if request.args.get('include_total') in ('1', 'true'):
+            count_query = query.with_entities(func.count(Review.id))
+            if platform or rating_int is not None:
+                pagination['total'] = count_query.scalar()
+            else:
+                cached = cache_get(REVIEW_COUNT_CACHE_KEY)
+                if cached is not None:
+                    pagination['total'] = int(cached)
+                else:
+                    pagination['total'] = count_query.scalar()
+                    cache_set(REVIEW_COUNT_CACHE_KEY, pagination['total'], REVIEW_COUNT_CACHE_TTL)
+        
+        # Fetch one extra row to learn whether another page exists without counting
+        rows = iter(query.offset(offset).limit(limit + 1).yield_per(50))
+        
+        # Run the query before streaming starts, so a database error is still answered with a 500 below
+        first = next(rows, None)
+        if first is not None:
+            rows = chain((first,), rows)
+        
+        def generate():
+            # Reviews are encoded one at a time, so memory stays flat regardless of limit
+            yield b'{"success":true,"data":['
+            pagination['has_more'] = False
+            for count, review in enumerate(rows):
+                if count == limit:
+                    pagination['has_more'] = True
+                    break
+                if count:
+                    yield b','
+                yield orjson.dumps(review.to_dict())
+            yield b'],"pagination":' + orjson.dumps(pagination) + b'}'
+        
+        return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
         
     except Exception as e:
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error fetching reviews: {str(e)}'
-        }), 500
+        }, 500)
 
 @integrations_bp.route('/api/v1/analytics/summary', methods=['GET'])
 @api_key_required(['read:analytics'])
@@ -642,27 +789,28 @@ def api_get_analytics_summary():
     """Public API: Get analytics summary"""
     try:
         from src.models.review import Review
-        from sqlalchemy import func
         
-        # Calculate basic metrics
-        total_reviews = Review.query.count()
-        avg_rating = db.session.query(func.avg(Review.rating)).scalar() or 0
-        
-        # Platform breakdown
+        # One grouped pass: per-platform figures plus table-wide totals via window functions
+        review_count = func.count(Review.id)
         platform_stats = db.session.query(
             Review.platform,
-            func.count(Review.id).label('count'),
-            func.avg(Review.rating).label('avg_rating')
+            review_count.label('count'),
+            func.avg(Review.rating).label('avg_rating'),
+            func.sum(review_count).over().label('total_reviews'),
+            func.sum(func.sum(Review.rating)).over().label('rating_sum')
         ).group_by(Review.platform).all()
         
-        return jsonify({
+        total_reviews = int(platform_stats[0].total_reviews) if platform_stats else 0
+        avg_rating = float(platform_stats[0].rating_sum) / total_reviews if total_reviews else 0.0
+        
+        return orjson_response({
             'success': True,
             'data': {
                 'total_reviews': total_reviews,
-                'average_rating': round(float(avg_rating), 2),
+                'average_rating': round(avg_rating, 2),
                 'platform_breakdown': [
                     {
-                        'platform': stat.platform,
+                        'platform': stat.platform.value,
                         'count': stat.count,
                         'average_rating': round(float(stat.avg_rating), 2)
                     }
@@ -672,73 +820,71 @@ def api_get_analytics_summary():
         })
         
     except Exception as e:
-        return jsonify({
+        return orjson_response({
             'success': False,
             'message': f'Error fetching analytics: {str(e)}'
-        }), 500
+        }, 500)
 
 # Integration Templates and Documentation
 
+_INTEGRATION_TEMPLATES = {
+    'google_my_business': {
+        'name': 'Google My Business',
+        'description': 'Sync reviews from Google My Business listings',
+        'config_fields': [
+            {'name': 'business_id', 'type': 'string', 'required': True, 'description': 'Google My Business location ID'},
+            {'name': 'api_key', 'type': 'password', 'required': True, 'description': 'Google API key'},
+            {'name': 'sync_frequency', 'type': 'number', 'required': False, 'description': 'Sync frequency in hours', 'default': 1}
+        ],
+        'features': ['Review sync', 'Response posting', 'Analytics'],
+        'documentation_url': '/docs/integrations/google-my-business'
+    },
+    'yelp': {
+        'name': 'Yelp',
+        'description': 'Monitor and respond to Yelp reviews',
+        'config_fields': [
+            {'name': 'business_id', 'type': 'string', 'required': True, 'description': 'Yelp business ID'},
+            {'name': 'api_key', 'type': 'password', 'required': True, 'description': 'Yelp Fusion API key'},
+            {'name': 'auto_respond', 'type': 'boolean', 'required': False, 'description': 'Enable automatic responses', 'default': False}
+        ],
+        'features': ['Review monitoring', 'Business info sync'],
+        'documentation_url': '/docs/integrations/yelp'
+    },
+    'slack': {
+        'name': 'Slack',
+        'description': 'Send review notifications to Slack channels',
+        'config_fields': [
+            {'name': 'webhook_url', 'type': 'url', 'required': True, 'description': 'Slack webhook URL'},
+            {'name': 'channel', 'type': 'string', 'required': False, 'description': 'Default channel name', 'default': '#reviews'},
+            {'name': 'notify_on_rating', 'type': 'number', 'required': False, 'description': 'Notify for ratings below this threshold', 'default': 3}
+        ],
+        'features': ['Real-time notifications', 'Custom channels', 'Rich formatting'],
+        'documentation_url': '/docs/integrations/slack'
+    },
+    'webhook': {
+        'name': 'Custom Webhook',
+        'description': 'Send events to custom webhook endpoints',
+        'config_fields': [
+            {'name': 'url', 'type': 'url', 'required': True, 'description': 'Webhook endpoint URL'},
+            {'name': 'secret', 'type': 'password', 'required': False, 'description': 'Webhook secret for signature verification'},
+            {'name': 'events', 'type': 'multiselect', 'required': True, 'description': 'Events to send', 'options': [event.value for event in WebhookEventType]}
+        ],
+        'features': ['Custom events', 'Signature verification', 'Retry logic'],
+        'documentation_url': '/docs/integrations/webhooks'
+    }
+}
+
+# Integration templates are static, so the response body is encoded once at import
+_INTEGRATION_TYPES_JSON = orjson.dumps({
+    'success': True,
+    'data': _INTEGRATION_TEMPLATES
+})
+
 @integrations_bp.route('/integration-types', methods=['GET'])
 @token_required
 def get_integration_types(current_user):
     """Get available integration types with configuration templates"""
-    try:
-        integration_templates = {
-            'google_my_business': {
-                'name': 'Google My Business',
-                'description': 'Sync reviews from Google My Business listings',
-                'config_fields': [
-                    {'name': 'business_id', 'type': 'string', 'required': True, 'description': 'Google My Business location ID'},
-                    {'name': 'api_key', 'type': 'password', 'required': True, 'description': 'Google API key'},
-                    {'name': 'sync_frequency', 'type': 'number', 'required': False, 'description': 'Sync frequency in hours', 'default': 1}
-                ],
-                'features': ['Review sync', 'Response posting', 'Analytics'],
-                'documentation_url': '/docs/integrations/google-my-business'
-            },
-            'yelp': {
-                'name': 'Yelp',
-                'description': 'Monitor and respond to Yelp reviews',
-                'config_fields': [
-                    {'name': 'business_id', 'type': 'string', 'required': True, 'description': 'Yelp business ID'},
-                    {'name': 'api_key', 'type': 'password', 'required': True, 'description': 'Yelp Fusion API key'},
-                    {'name': 'auto_respond', 'type': 'boolean', 'required': False, 'description': 'Enable automatic responses', 'default': False}
-                ],
-                'features': ['Review monitoring', 'Business info sync'],
-                'documentation_url': '/docs/integrations/yelp'
-            },
-            'slack': {
-                'name': 'Slack',
-                'description': 'Send review notifications to Slack channels',
-                'config_fields': [
-                    {'name': 'webhook_url', 'type': 'url', 'required': True, 'description': 'Slack webhook URL'},
-                    {'name': 'channel', 'type': 'string', 'required': False, 'description': 'Default channel name', 'default': '#reviews'},
-                    {'name': 'notify_on_rating', 'type': 'number', 'required': False, 'description': 'Notify for ratings below this threshold', 'default': 3}
-                ],
-                'features': ['Real-time notifications', 'Custom channels', 'Rich formatting'],
-                'documentation_url': '/docs/integrations/slack'
-            },
-            'webhook': {
-                'name': 'Custom Webhook',
-                'description': 'Send events to custom webhook endpoints',
-                'config_fields': [
-                    {'name': 'url', 'type': 'url', 'required': True, 'description': 'Webhook endpoint URL'},
-                    {'name': 'secret', 'type': 'password', 'required': False, 'description': 'Webhook secret for signature verification'},
-                    {'name': 'events', 'type': 'multiselect', 'required': True, 'description': 'Events to send', 'options': [event.value for event in WebhookEventType]}
-                ],
-                'features': ['Custom events', 'Signature verification', 'Retry logic'],
-                'documentation_url': '/docs/integrations/webhooks'
-            }
-        }
-        
-        return jsonify({
-            'success': True,
-            'data': integration_templates
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'Error fetching integration types: {str(e)}'
-        }), 500
+    response = current_app.response_class(_INTEGRATION_TYPES_JSON, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
 
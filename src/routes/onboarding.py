@@ -1,251 +1,324 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, current_app, g, stream_with_context
+from werkzeug.exceptions import HTTPException
 from datetime import datetime, timedelta
 from src.models.user import db
 from src.models.auth import AuthUser, UserRole
 from src.models.onboarding import (
     UserOnboarding, UserTourProgress, DashboardLayout, UserPreferences,
-    FeatureAnnouncement, UserAnnouncementView, OnboardingManager,
+    OnboardingManager,
     OnboardingStatus, TourType, WidgetType
 )
 from src.routes.auth import token_required
+from src.services.cache import cache_get, cache_set, cache_delete
+from src.services.announcement_views import view_buffer
+from sqlalchemy import insert, update
 import json
+import orjson
+from itertools import chain
 
 onboarding_bp = Blueprint('onboarding', __name__)
 
+ONBOARDING_CACHE_TTL = 60  # seconds
+
+def status_cache_key(user_id):
+    return f"onboarding:status:{user_id}"
+
+def tours_cache_key(user_id):
+    return f"onboarding:tours:{user_id}"
+
+def prefs_cache_key(user_id):
+    return f"onboarding:prefs:{user_id}"
+
+def invalidate_onboarding_cache(user_id):
+    """Drop every cached onboarding payload for a user in a single DEL"""
+    cache_delete(status_cache_key(user_id), tours_cache_key(user_id), prefs_cache_key(user_id))
+
+def orjson_response(payload, status=200):
+    """Serialize a payload with orjson into a JSON response"""
+    return json_bytes_response(orjson.dumps(payload), status)
+
+def json_bytes_response(body, status=200):
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+def load_user_preferences(user_id):
+    """Get or create the user's preferences, at most once per request"""
+    if 'user_prefs' not in g:
+        g.user_prefs = OnboardingManager.get_user_preferences(user_id)
+    return g.user_prefs
+
+@onboarding_bp.before_request
+def stamp_request_time():
+    """Take one timestamp per request so every field written by it agrees"""
+    g.now = datetime.utcnow()
+
+@onboarding_bp.errorhandler(Exception)
+def handle_unexpected_error(e):
+    """Roll back the session and return a JSON error for unhandled exceptions"""
+    if isinstance(e, HTTPException):
+        return e
+    db.session.rollback()
+    current_app.logger.exception(e)
+    return orjson_response({'success': False, 'error': str(e)}, 500)
+
 # Onboarding Management Routes
 
+# Columns a client may pick with ?fields=, and the ones next_steps always needs
+_ONBOARDING_FIELDS = frozenset(attr.key for attr in UserOnboarding.__mapper__.column_attrs)
+_NEXT_STEP_FIELDS = frozenset((
+    'profile_completed', 'first_integration_added', 'dashboard_customized',
+    'first_review_responded', 'team_invited'
+))
+
 @onboarding_bp.route('/onboarding/status', methods=['GET'])
 @token_required
 def get_onboarding_status(current_user):
     """Get user's onboarding status and progress"""
-    try:
-        onboarding = OnboardingManager.get_or_create_onboarding(current_user.id)
-        
-        # Get tour progress
-        tours = UserTourProgress.query.filter_by(onboarding_id=onboarding.id).all()
-        tour_progress = {tour.tour_type.value: tour.to_dict() for tour in tours}
-        
-        # Get user preferences
-        preferences = OnboardingManager.get_user_preferences(current_user.id)
-        
-        return jsonify({
+    # ?fields= returns just those onboarding columns plus next_steps, loading nothing else
+    fields = request.args.get('fields')
+    if fields:
+        requested = [field for field in fields.split(',') if field]
+        unknown = set(requested) - _ONBOARDING_FIELDS
+        if unknown:
+            return orjson_response({'success': False, 'error': f"Unknown fields: {', '.join(sorted(unknown))}"}, 400)
+        
+        onboarding = OnboardingManager.get_onboarding_fields(current_user.id, _NEXT_STEP_FIELDS.union(requested))
+        return orjson_response({
             'success': True,
-            'onboarding': onboarding.to_dict(),
-            'tour_progress': tour_progress,
-            'preferences': preferences.to_dict(),
+            'onboarding': onboarding.to_partial_dict(requested),
             'next_steps': _get_next_onboarding_steps(onboarding)
         })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    cache_key = status_cache_key(current_user.id)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return json_bytes_response(cached)
+    
+    onboarding = OnboardingManager.get_or_create_onboarding(current_user.id, load_tours=True)
+    tour_progress = {tour.tour_type.value: tour.to_dict() for tour in onboarding.tour_progress}
+    
+    # Get user preferences
+    preferences = load_user_preferences(current_user.id)
+    
+    body = orjson.dumps({
+        'success': True,
+        'onboarding': onboarding.to_dict(),
+        'tour_progress': tour_progress,
+        'preferences': preferences.to_dict(),
+        'next_steps': _get_next_onboarding_steps(onboarding)
+    })
+    cache_set(cache_key, body, ONBOARDING_CACHE_TTL)
+    return json_bytes_response(body)
 
 @onboarding_bp.route('/onboarding/start', methods=['POST'])
 @token_required
 def start_onboarding(current_user):
     """Start the onboarding process"""
-    try:
-        onboarding = OnboardingManager.start_onboarding(current_user.id)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Onboarding started successfully',
-            'onboarding': onboarding.to_dict()
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    onboarding = OnboardingManager.start_onboarding(current_user.id)
+    invalidate_onboarding_cache(current_user.id)
+    
+    return orjson_response({
+        'success': True,
+        'message': 'Onboarding started successfully',
+        'onboarding': onboarding.to_dict()
+    })
 
 @onboarding_bp.route('/onboarding/step/<step_id>/complete', methods=['POST'])
 @token_required
 def complete_onboarding_step(current_user, step_id):
     """Mark an onboarding step as completed"""
-    try:
-        data = request.get_json() or {}
-        
-        onboarding = OnboardingManager.complete_onboarding_step(current_user.id, step_id)
-        
-        # Update milestone if provided
-        milestone = data.get('milestone')
-        if milestone:
-            setattr(onboarding, milestone, True)
-            db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': f'Step {step_id} completed successfully',
-            'onboarding': onboarding.to_dict()
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    data = request.get_json() or {}
+    
+    onboarding = OnboardingManager.complete_onboarding_step(current_user.id, step_id)
+    
+    # Update milestone if provided
+    milestone = data.get('milestone')
+    if milestone:
+        setattr(onboarding, milestone, True)
+        db.session.commit()
+    
+    invalidate_onboarding_cache(current_user.id)
+    
+    return orjson_response({
+        'success': True,
+        'message': f'Step {step_id} completed successfully',
+        'onboarding': onboarding.to_dict()
+    })
 
 @onboarding_bp.route('/onboarding/skip', methods=['POST'])
 @token_required
 def skip_onboarding(current_user):
     """Skip the onboarding process"""
-    try:
-        onboarding = OnboardingManager.get_or_create_onboarding(current_user.id)
-        onboarding.status = OnboardingStatus.SKIPPED
-        onboarding.completed_at = datetime.utcnow()
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Onboarding skipped successfully',
-            'onboarding': onboarding.to_dict()
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    onboarding = OnboardingManager.get_or_create_onboarding(current_user.id)
+    onboarding.status = OnboardingStatus.SKIPPED
+    onboarding.completed_at = g.now
+    db.session.commit()
+    invalidate_onboarding_cache(current_user.id)
+    
+    return orjson_response({
+        'success': True,
+        'message': 'Onboarding skipped successfully',
+        'onboarding': onboarding.to_dict()
+    })
 
 # Tour Management Routes
 
+_AVAILABLE_TOURS = (
+    {
+        'type': 'welcome',
+        'title': 'Welcome to ReviewAssist Pro',
+        'description': 'Get started with the basics of review management',
+        'duration': '3-5 minutes',
+        'steps': 5,
+        'required': True
+    },
+    {
+        'type': 'dashboard',
+        'title': 'Dashboard Overview',
+        'description': 'Learn about your analytics dashboard and key metrics',
+        'duration': '2-3 minutes',
+        'steps': 4,
+        'required': False
+    },
+    {
+        'type': 'reviews',
+        'title': 'Review Management',
+        'description': 'Master review filtering, responding, and bulk operations',
+        'duration': '4-6 minutes',
+        'steps': 6,
+        'required': False
+    },
+    {
+        'type': 'analytics',
+        'title': 'Advanced Analytics',
+        'description': 'Explore reporting, insights, and performance tracking',
+        'duration': '3-4 minutes',
+        'steps': 5,
+        'required': False
+    },
+    {
+        'type': 'integrations',
+        'title': 'Platform Integrations',
+        'description': 'Connect with Google, Yelp, Facebook, and other platforms',
+        'duration': '5-7 minutes',
+        'steps': 7,
+        'required': False
+    },
+    {
+        'type': 'automation',
+        'title': 'Workflow Automation',
+        'description': 'Set up automated responses and scheduled reports',
+        'duration': '4-5 minutes',
+        'steps': 6,
+        'required': False
+    }
+)
+
+_TOUR_TYPE_BY_VALUE = {tour_type.value: tour_type for tour_type in TourType}
+
+_NOT_STARTED_PROGRESS = {
+    'status': 'not_started',
+    'current_step': 0,
+    'progress_percentage': 0
+}
+
 @onboarding_bp.route('/tours/available', methods=['GET'])
 @token_required
 def get_available_tours(current_user):
     """Get available tours for the user"""
-    try:
-        tours = [
-            {
-                'type': 'welcome',
-                'title': 'Welcome to ReviewAssist Pro',
-                'description': 'Get started with the basics of review management',
-                'duration': '3-5 minutes',
-                'steps': 5,
-                'required': True
-            },
-            {
-                'type': 'dashboard',
-                'title': 'Dashboard Overview',
-                'description': 'Learn about your analytics dashboard and key metrics',
-                'duration': '2-3 minutes',
-                'steps': 4,
-                'required': False
-            },
-            {
-                'type': 'reviews',
-                'title': 'Review Management',
-                'description': 'Master review filtering, responding, and bulk operations',
-                'duration': '4-6 minutes',
-                'steps': 6,
-                'required': False
-            },
-            {
-                'type': 'analytics',
-                'title': 'Advanced Analytics',
-                'description': 'Explore reporting, insights, and performance tracking',
-                'duration': '3-4 minutes',
-                'steps': 5,
-                'required': False
-            },
-            {
-                'type': 'integrations',
-                'title': 'Platform Integrations',
-                'description': 'Connect with Google, Yelp, Facebook, and other platforms',
-                'duration': '5-7 minutes',
-                'steps': 7,
-                'required': False
-            },
-            {
-                'type': 'automation',
-                'title': 'Workflow Automation',
-                'description': 'Set up automated responses and scheduled reports',
-                'duration': '4-5 minutes',
-                'steps': 6,
-                'required': False
-            }
-        ]
-        
-        # Get user's tour progress
-        onboarding = OnboardingManager.get_or_create_onboarding(current_user.id)
-        tour_progress = UserTourProgress.query.filter_by(onboarding_id=onboarding.id).all()
-        progress_dict = {tour.tour_type.value: tour.to_dict() for tour in tour_progress}
-        
-        # Add progress to each tour
-        for tour in tours:
-            tour['progress'] = progress_dict.get(tour['type'], {
-                'status': 'not_started',
-                'current_step': 0,
-                'progress_percentage': 0
-            })
-        
-        return jsonify({
-            'success': True,
-            'tours': tours
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    cache_key = tours_cache_key(current_user.id)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return json_bytes_response(cached)
+    
+    # Get user's tour progress
+    onboarding = OnboardingManager.get_or_create_onboarding(current_user.id, load_tours=True)
+    progress_dict = {tour.tour_type.value: tour.to_dict() for tour in onboarding.tour_progress}
+    
+    # Merge progress into copies so the shared catalog is never mutated
+    tours = [
+        {**tour, 'progress': progress_dict.get(tour['type'], _NOT_STARTED_PROGRESS)}
+        for tour in _AVAILABLE_TOURS
+    ]
+    
+    body = orjson.dumps({
+        'success': True,
+        'tours': tours
+    })
+    cache_set(cache_key, body, ONBOARDING_CACHE_TTL)
+    return json_bytes_response(body)
 
 @onboarding_bp.route('/tours/<tour_type>/start', methods=['POST'])
 @token_required
 def start_tour(current_user, tour_type):
     """Start a specific tour"""
-    try:
-        # Validate tour type
-        try:
-            tour_enum = TourType(tour_type)
-        except ValueError:
-            return jsonify({'success': False, 'error': 'Invalid tour type'}), 400
-        
-        onboarding = OnboardingManager.get_or_create_onboarding(current_user.id)
-        
-        # Get or create tour progress
-        tour_progress = UserTourProgress.query.filter_by(
+    # Validate tour type
+    tour_enum = _TOUR_TYPE_BY_VALUE.get(tour_type)
+    if tour_enum is None:
+        return orjson_response({'success': False, 'error': 'Invalid tour type'}, 400)
+    
+    onboarding = OnboardingManager.get_or_create_onboarding(current_user.id)
+    
+    # Get or create tour progress
+    tour_progress = UserTourProgress.query.filter_by(
+        onboarding_id=onboarding.id,
+        tour_type=tour_enum
+    ).first()
+    
+    if not tour_progress:
+        tour_progress = UserTourProgress(
             onboarding_id=onboarding.id,
-            tour_type=tour_enum
-        ).first()
-        
-        if not tour_progress:
-            tour_progress = UserTourProgress(
-                onboarding_id=onboarding.id,
-                tour_type=tour_enum,
-                total_steps=_get_tour_steps(tour_type)
-            )
-            db.session.add(tour_progress)
-        
-        tour_progress.status = OnboardingStatus.IN_PROGRESS
-        tour_progress.started_at = datetime.utcnow()
-        tour_progress.last_step_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': f'{tour_type} tour started successfully',
-            'tour_progress': tour_progress.to_dict(),
-            'tour_steps': _get_tour_content(tour_type)
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+            tour_type=tour_enum,
+            total_steps=_get_tour_steps(tour_type)
+        )
+        db.session.add(tour_progress)
+    
+    tour_progress.status = OnboardingStatus.IN_PROGRESS
+    tour_progress.started_at = g.now
+    tour_progress.last_step_at = g.now
+    
+    db.session.commit()
+    invalidate_onboarding_cache(current_user.id)
+    
+    return orjson_response({
+        'success': True,
+        'message': f'{tour_type} tour started successfully',
+        'tour_progress': tour_progress.to_dict(),
+        'tour_steps': _get_tour_content(tour_type)
+    })
 
 @onboarding_bp.route('/tours/<tour_type>/step/<int:step_number>', methods=['POST'])
 @token_required
 def update_tour_step(current_user, tour_type, step_number):
     """Update tour step progress"""
-    try:
-        tour_enum = TourType(tour_type)
-        onboarding = OnboardingManager.get_or_create_onboarding(current_user.id)
-        
-        tour_progress = UserTourProgress.query.filter_by(
-            onboarding_id=onboarding.id,
-            tour_type=tour_enum
-        ).first()
-        
-        if not tour_progress:
-            return jsonify({'success': False, 'error': 'Tour not found'}), 404
-        
-        tour_progress.current_step = step_number
-        tour_progress.last_step_at = datetime.utcnow()
-        
-        # Check if tour is completed
-        if step_number >= tour_progress.total_steps:
-            tour_progress.status = OnboardingStatus.COMPLETED
-            tour_progress.completed_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'tour_progress': tour_progress.to_dict()
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    tour_enum = _TOUR_TYPE_BY_VALUE.get(tour_type)
+    if tour_enum is None:
+        return orjson_response({'success': False, 'error': 'Invalid tour type'}, 400)
+    
+    onboarding = OnboardingManager.get_or_create_onboarding(current_user.id)
+    
+    tour_progress = UserTourProgress.query.filter_by(
+        onboarding_id=onboarding.id,
+        tour_type=tour_enum
+    ).first()
+    
+    if not tour_progress:
+        return orjson_response({'success': False, 'error': 'Tour not found'}, 404)
+    
+    tour_progress.current_step = step_number
+    tour_progress.last_step_at = g.now
+    
+    # Check if tour is completed
+    if step_number >= tour_progress.total_steps:
+        tour_progress.status = OnboardingStatus.COMPLETED
+        tour_progress.completed_at = g.now
+    
+    db.session.commit()
+    invalidate_onboarding_cache(current_user.id)
+    
+    return orjson_response({
+        'success': True,
+        'tour_progress': tour_progress.to_dict()
+    })
 
 # Dashboard Customization Routes
 
@@ -253,103 +326,94 @@ def update_tour_step(current_user, tour_type, step_number):
 @token_required
 def get_dashboard_layouts(current_user):
     """Get user's dashboard layouts"""
-    try:
-        layouts = DashboardLayout.query.filter_by(
-            user_id=current_user.id,
-            is_active=True
-        ).order_by(DashboardLayout.is_default.desc(), DashboardLayout.last_used_at.desc()).all()
-        
-        # If no layouts exist, create default ones
-        if not layouts:
-            layouts = _create_default_layouts(current_user.id)
-        
-        return jsonify({
-            'success': True,
-            'layouts': [layout.to_dict() for layout in layouts]
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    layouts = DashboardLayout.query.filter_by(
+        user_id=current_user.id,
+        is_active=True
+    ).order_by(DashboardLayout.is_default.desc(), DashboardLayout.last_used_at.desc()).all()
+    
+    # If no layouts exist, create default ones
+    if layouts:
+        layout_dicts = [layout.to_dict() for layout in layouts]
+    else:
+        layout_dicts = _create_default_layouts(current_user.id)
+    
+    return orjson_response({
+        'success': True,
+        'layouts': layout_dicts
+    })
 
 @onboarding_bp.route('/dashboard/layouts', methods=['POST'])
 @token_required
 def create_dashboard_layout(current_user):
     """Create a new dashboard layout"""
-    try:
-        data = request.get_json()
-        
-        layout = DashboardLayout(
-            user_id=current_user.id,
-            name=data.get('name', 'Custom Layout'),
-            description=data.get('description'),
-            tags=','.join(data.get('tags', [])),
-            is_default=data.get('is_default', False)
-        )
-        
-        layout.set_layout_data(data.get('layout_data', {}))
-        
-        # If this is set as default, unset other defaults
-        if layout.is_default:
-            DashboardLayout.query.filter_by(
-                user_id=current_user.id,
-                is_default=True
-            ).update({'is_default': False})
-        
-        db.session.add(layout)
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Dashboard layout created successfully',
-            'layout': layout.to_dict()
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    data = request.get_json()
+    
+    layout = DashboardLayout(
+        user_id=current_user.id,
+        name=data.get('name', 'Custom Layout'),
+        description=data.get('description'),
+        tags=data.get('tags', []),
+        is_default=data.get('is_default', False)
+    )
+    
+    layout.set_layout_data(data.get('layout_data', {}))
+    
+    # If this is set as default, unset the current default first
+    if layout.is_default:
+        OnboardingManager.clear_default_layout(current_user.id)
+    
+    db.session.add(layout)
+    db.session.commit()
+    
+    return orjson_response({
+        'success': True,
+        'message': 'Dashboard layout created successfully',
+        'layout': layout.to_dict()
+    })
 
 @onboarding_bp.route('/dashboard/layouts/<int:layout_id>', methods=['PUT'])
 @token_required
 def update_dashboard_layout(current_user, layout_id):
     """Update a dashboard layout"""
-    try:
-        layout = DashboardLayout.query.filter_by(
-            id=layout_id,
-            user_id=current_user.id
-        ).first()
-        
-        if not layout:
-            return jsonify({'success': False, 'error': 'Layout not found'}), 404
-        
-        data = request.get_json()
-        
-        if 'name' in data:
-            layout.name = data['name']
-        if 'description' in data:
-            layout.description = data['description']
-        if 'tags' in data:
-            layout.tags = ','.join(data['tags'])
-        if 'layout_data' in data:
-            layout.set_layout_data(data['layout_data'])
-        if 'is_default' in data:
-            layout.is_default = data['is_default']
-            
-            # If this is set as default, unset other defaults
-            if layout.is_default:
-                DashboardLayout.query.filter_by(
-                    user_id=current_user.id,
-                    is_default=True
-                ).filter(DashboardLayout.id != layout_id).update({'is_default': False})
-        
-        layout.last_used_at = datetime.utcnow()
-        layout.usage_count += 1
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Dashboard layout updated successfully',
-            'layout': layout.to_dict()
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    data = request.get_json()
+    
+    changes = {}
+    if 'name' in data:
+        changes['name'] = data['name']
+    if 'description' in data:
+        changes['description'] = data['description']
+    if 'tags' in data:
+        changes['tags'] = data['tags']
+    if 'layout_data' in data:
+        changes['layout_data'] = json.dumps(data['layout_data'])
+    if 'is_default' in data:
+        # Clear the old default before setting the new one so the unique index never sees two
+        if data['is_default']:
+            OnboardingManager.clear_default_layout(current_user.id, except_id=layout_id)
+        changes['is_default'] = data['is_default']
+    
+    # One UPDATE applies the changes and bumps the usage counter without loading the row first
+    result = db.session.execute(
+        update(DashboardLayout)
+        .where(DashboardLayout.id == layout_id, DashboardLayout.user_id == current_user.id)
+        .values(
+            usage_count=DashboardLayout.usage_count + 1,
+            last_used_at=g.now,
+            **changes
+        )
+    )
+    if result.rowcount == 0:
+        db.session.rollback()
+        return orjson_response({'success': False, 'error': 'Layout not found'}, 404)
+    
+    db.session.commit()
+    
+    layout = db.session.get(DashboardLayout, layout_id)
+    return orjson_response({
+        'success': True,
+        'message': 'Dashboard layout updated successfully',
+        'layout': layout.to_dict()
+    })
 
 # User Preferences Routes
 
@@ -357,283 +421,256 @@ def update_dashboard_layout(current_user, layout_id):
 @token_required
 def get_user_preferences(current_user):
     """Get user preferences"""
-    try:
-        preferences = OnboardingManager.get_user_preferences(current_user.id)
-        return jsonify({
-            'success': True,
-            'preferences': preferences.to_dict()
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    cache_key = prefs_cache_key(current_user.id)
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return json_bytes_response(cached)
+    
+    preferences = load_user_preferences(current_user.id)
+    body = orjson.dumps({
+        'success': True,
+        'preferences': preferences.to_dict()
+    })
+    cache_set(cache_key, body, ONBOARDING_CACHE_TTL)
+    return json_bytes_response(body)
+
+# Request keys mapped to UserPreferences columns, per section of the payload
+_PREFERENCE_FIELDS = {
+    'theme': 'theme',
+    'language': 'language',
+    'timezone': 'timezone',
+    'date_format': 'date_format',
+    'time_format': 'time_format',
+    'items_per_page': 'items_per_page',
+    'auto_refresh_interval': 'auto_refresh_interval'
+}
+
+_NOTIFICATION_FIELDS = {
+    'email': 'email_notifications',
+    'push': 'push_notifications',
+    'desktop': 'desktop_notifications',
+    'sound': 'notification_sound'
+}
+
+_FEATURE_FIELDS = {
+    'keyboard_shortcuts': 'keyboard_shortcuts_enabled',
+    'advanced_mode': 'advanced_mode',
+    'beta_features': 'beta_features_enabled',
+    'analytics_tracking': 'analytics_tracking'
+}
 
 @onboarding_bp.route('/preferences', methods=['PUT'])
 @token_required
 def update_user_preferences(current_user):
     """Update user preferences"""
-    try:
-        preferences = OnboardingManager.get_user_preferences(current_user.id)
-        data = request.get_json()
-        
-        # Update UI preferences
-        if 'theme' in data:
-            preferences.theme = data['theme']
-        if 'language' in data:
-            preferences.language = data['language']
-        if 'timezone' in data:
-            preferences.timezone = data['timezone']
-        if 'date_format' in data:
-            preferences.date_format = data['date_format']
-        if 'time_format' in data:
-            preferences.time_format = data['time_format']
-        
-        # Update dashboard preferences
-        if 'items_per_page' in data:
-            preferences.items_per_page = data['items_per_page']
-        if 'auto_refresh_interval' in data:
-            preferences.auto_refresh_interval = data['auto_refresh_interval']
-        
-        # Update notification preferences
-        notifications = data.get('notifications', {})
-        if 'email' in notifications:
-            preferences.email_notifications = notifications['email']
-        if 'push' in notifications:
-            preferences.push_notifications = notifications['push']
-        if 'desktop' in notifications:
-            preferences.desktop_notifications = notifications['desktop']
-        if 'sound' in notifications:
-            preferences.notification_sound = notifications['sound']
-        
-        # Update feature preferences
-        features = data.get('features', {})
-        if 'keyboard_shortcuts' in features:
-            preferences.keyboard_shortcuts_enabled = features['keyboard_shortcuts']
-        if 'advanced_mode' in features:
-            preferences.advanced_mode = features['advanced_mode']
-        if 'beta_features' in features:
-            preferences.beta_features_enabled = features['beta_features']
-        if 'analytics_tracking' in features:
-            preferences.analytics_tracking = features['analytics_tracking']
-        
-        # Update quick actions
-        if 'favorite_actions' in data:
-            preferences.set_favorite_actions(data['favorite_actions'])
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Preferences updated successfully',
-            'preferences': preferences.to_dict()
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    data = request.get_json()
+    
+    # Collect every change into one column -> value mapping
+    changes = {column: data[key] for key, column in _PREFERENCE_FIELDS.items() if key in data}
+    notifications = data.get('notifications', {})
+    changes.update({column: notifications[key] for key, column in _NOTIFICATION_FIELDS.items() if key in notifications})
+    features = data.get('features', {})
+    changes.update({column: features[key] for key, column in _FEATURE_FIELDS.items() if key in features})
+    if 'favorite_actions' in data:
+        changes['favorite_actions'] = json.dumps(data['favorite_actions'])
+    
+    # Write with a single UPDATE; only a user without a preferences row needs it created first
+    if changes:
+        stmt = update(UserPreferences).where(UserPreferences.user_id == current_user.id).values(**changes)
+        if db.session.execute(stmt).rowcount == 0:
+            load_user_preferences(current_user.id)
+            db.session.execute(stmt)
+    
+    db.session.commit()
+    invalidate_onboarding_cache(current_user.id)
+    
+    preferences = load_user_preferences(current_user.id)
+    return orjson_response({
+        'success': True,
+        'message': 'Preferences updated successfully',
+        'preferences': preferences.to_dict()
+    })
 
 # Feature Announcements Routes
 
+_UNVIEWED = {
+    'viewed': False,
+    'clicked': False,
+    'dismissed': False
+}
+
 @onboarding_bp.route('/announcements', methods=['GET'])
 @token_required
 def get_feature_announcements(current_user):
     """Get active feature announcements for user"""
-    try:
-        announcements = OnboardingManager.get_active_announcements(current_user.role)
-        
-        # Get user's view history
-        viewed_announcements = UserAnnouncementView.query.filter_by(
-            user_id=current_user.id
-        ).all()
-        viewed_dict = {view.announcement_id: view.to_dict() for view in viewed_announcements}
-        
-        # Add view status to announcements
-        result = []
-        for announcement in announcements:
+    # Announcements and this user's view records come back from one outer join
+    rows = iter(OnboardingManager.announcements_with_views_query(current_user.id, current_user.role).yield_per(100))
+    
+    # Run the query before streaming starts, so a database error still reaches the error handler as a 500
+    first = next(rows, None)
+    if first is not None:
+        rows = chain((first,), rows)
+    
+    def generate():
+        # Announcements are encoded one at a time, so memory stays flat as the list grows
+        yield b'{"success":true,"announcements":['
+        for count, (announcement, view) in enumerate(rows):
+            if count:
+                yield b','
             announcement_dict = announcement.to_dict()
-            announcement_dict['user_view'] = viewed_dict.get(announcement.id, {
-                'viewed': False,
-                'clicked': False,
-                'dismissed': False
-            })
-            result.append(announcement_dict)
-        
-        return jsonify({
-            'success': True,
-            'announcements': result
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+            announcement_dict['user_view'] = view.to_dict() if view else _UNVIEWED
+            yield orjson.dumps(announcement_dict)
+        yield b']}'
+    
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
 
 @onboarding_bp.route('/announcements/<int:announcement_id>/view', methods=['POST'])
 @token_required
 def mark_announcement_viewed(current_user, announcement_id):
     """Mark an announcement as viewed"""
-    try:
-        # Get or create view record
-        view = UserAnnouncementView.query.filter_by(
-            user_id=current_user.id,
-            announcement_id=announcement_id
-        ).first()
-        
-        if not view:
-            view = UserAnnouncementView(
-                user_id=current_user.id,
-                announcement_id=announcement_id
-            )
-            db.session.add(view)
-        
-        # Update announcement view count
-        announcement = FeatureAnnouncement.query.get(announcement_id)
-        if announcement:
-            announcement.view_count += 1
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Announcement marked as viewed'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    OnboardingManager.upsert_announcement_view(current_user.id, announcement_id)
+    db.session.commit()
+    
+    # The view counter is added up and written by a background thread
+    view_buffer.put(current_app._get_current_object(), announcement_id)
+    
+    return orjson_response({
+        'success': True,
+        'message': 'Announcement marked as viewed'
+    })
 
 @onboarding_bp.route('/announcements/<int:announcement_id>/dismiss', methods=['POST'])
 @token_required
 def dismiss_announcement(current_user, announcement_id):
     """Dismiss an announcement"""
-    try:
-        view = UserAnnouncementView.query.filter_by(
-            user_id=current_user.id,
-            announcement_id=announcement_id
-        ).first()
-        
-        if not view:
-            view = UserAnnouncementView(
-                user_id=current_user.id,
-                announcement_id=announcement_id
-            )
-            db.session.add(view)
-        
-        view.dismissed = True
-        view.dismissed_at = datetime.utcnow()
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'message': 'Announcement dismissed'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    OnboardingManager.upsert_announcement_view(
+        current_user.id, announcement_id,
+        dismissed=True,
+        dismissed_at=g.now
+    )
+    db.session.commit()
+    
+    return orjson_response({
+        'success': True,
+        'message': 'Announcement dismissed'
+    })
 
 # Quick Actions Routes
 
+# Quick actions offered to each role
+_ALL_QUICK_ACTIONS = (
+    {
+        'id': 'respond_to_reviews',
+        'title': 'Respond to Reviews',
+        'description': 'Quickly respond to pending reviews',
+        'icon': 'reply',
+        'shortcut': 'Ctrl+R',
+        'category': 'reviews',
+        'roles': ['admin', 'manager', 'agent']
+    },
+    {
+        'id': 'generate_report',
+        'title': 'Generate Report',
+        'description': 'Create analytics report',
+        'icon': 'chart-bar',
+        'shortcut': 'Ctrl+G',
+        'category': 'analytics',
+        'roles': ['admin', 'manager']
+    },
+    {
+        'id': 'add_integration',
+        'title': 'Add Integration',
+        'description': 'Connect new platform',
+        'icon': 'plus-circle',
+        'shortcut': 'Ctrl+I',
+        'category': 'integrations',
+        'roles': ['admin', 'manager']
+    },
+    {
+        'id': 'bulk_respond',
+        'title': 'Bulk Respond',
+        'description': 'Respond to multiple reviews',
+        'icon': 'layers',
+        'shortcut': 'Ctrl+B',
+        'category': 'reviews',
+        'roles': ['admin', 'manager', 'agent']
+    },
+    {
+        'id': 'export_data',
+        'title': 'Export Data',
+        'description': 'Export reviews and analytics',
+        'icon': 'download',
+        'shortcut': 'Ctrl+E',
+        'category': 'data',
+        'roles': ['admin', 'manager']
+    },
+    {
+        'id': 'create_automation',
+        'title': 'Create Automation',
+        'description': 'Set up automated workflow',
+        'icon': 'cog',
+        'shortcut': 'Ctrl+A',
+        'category': 'automation',
+        'roles': ['admin', 'manager']
+    }
+)
+
+_QUICK_ACTION_CATEGORIES = ('reviews', 'analytics', 'integrations', 'automation', 'data')
+
+# Role filtering is resolved once here so a request only does a dict lookup
+_QUICK_ACTIONS_BY_ROLE = {
+    role.value: tuple(
+        action for action in _ALL_QUICK_ACTIONS
+        if role.value in action['roles'] or 'all' in action['roles']
+    )
+    for role in UserRole
+}
+
 @onboarding_bp.route('/quick-actions', methods=['GET'])
 @token_required
 def get_quick_actions(current_user):
     """Get available quick actions for user"""
-    try:
-        # Define available quick actions based on user role
-        all_actions = [
-            {
-                'id': 'respond_to_reviews',
-                'title': 'Respond to Reviews',
-                'description': 'Quickly respond to pending reviews',
-                'icon': 'reply',
-                'shortcut': 'Ctrl+R',
-                'category': 'reviews',
-                'roles': ['admin', 'manager', 'agent']
-            },
-            {
-                'id': 'generate_report',
-                'title': 'Generate Report',
-                'description': 'Create analytics report',
-                'icon': 'chart-bar',
-                'shortcut': 'Ctrl+G',
-                'category': 'analytics',
-                'roles': ['admin', 'manager']
-            },
-            {
-                'id': 'add_integration',
-                'title': 'Add Integration',
-                'description': 'Connect new platform',
-                'icon': 'plus-circle',
-                'shortcut': 'Ctrl+I',
-                'category': 'integrations',
-                'roles': ['admin', 'manager']
-            },
-            {
-                'id': 'bulk_respond',
-                'title': 'Bulk Respond',
-                'description': 'Respond to multiple reviews',
-                'icon': 'layers',
-                'shortcut': 'Ctrl+B',
-                'category': 'reviews',
-                'roles': ['admin', 'manager', 'agent']
-            },
-            {
-                'id': 'export_data',
-                'title': 'Export Data',
-                'description': 'Export reviews and analytics',
-                'icon': 'download',
-                'shortcut': 'Ctrl+E',
-                'category': 'data',
-                'roles': ['admin', 'manager']
-            },
-            {
-                'id': 'create_automation',
-                'title': 'Create Automation',
-                'description': 'Set up automated workflow',
-                'icon': 'cog',
-                'shortcut': 'Ctrl+A',
-                'category': 'automation',
-                'roles': ['admin', 'manager']
-            }
-        ]
-        
-        # Filter actions by user role
-        user_role = current_user.role.value
-        available_actions = [
-            action for action in all_actions
-            if user_role in action['roles'] or 'all' in action['roles']
-        ]
-        
-        # Get user's favorite actions
-        preferences = OnboardingManager.get_user_preferences(current_user.id)
-        favorite_action_ids = preferences.get_favorite_actions()
-        
-        # Mark favorite actions
-        for action in available_actions:
-            action['is_favorite'] = action['id'] in favorite_action_ids
-        
-        return jsonify({
-            'success': True,
-            'actions': available_actions,
-            'categories': ['reviews', 'analytics', 'integrations', 'automation', 'data']
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    available_actions = _QUICK_ACTIONS_BY_ROLE.get(current_user.role.value, ())
+    
+    # Get user's favorite actions
+    preferences = load_user_preferences(current_user.id)
+    favorite_action_ids = frozenset(preferences.get_favorite_actions())
+    
+    # Mark favorite actions on copies of the shared catalog entries
+    actions = [
+        {**action, 'is_favorite': action['id'] in favorite_action_ids}
+        for action in available_actions
+    ]
+    
+    return orjson_response({
+        'success': True,
+        'actions': actions,
+        'categories': list(_QUICK_ACTION_CATEGORIES)
+    })
 
 @onboarding_bp.route('/quick-actions/<action_id>/favorite', methods=['POST'])
 @token_required
 def toggle_favorite_action(current_user, action_id):
     """Toggle favorite status for a quick action"""
-    try:
-        preferences = OnboardingManager.get_user_preferences(current_user.id)
-        favorites = preferences.get_favorite_actions()
-        
-        if action_id in favorites:
-            favorites.remove(action_id)
-            is_favorite = False
-        else:
-            preferences.add_favorite_action(action_id)
-            is_favorite = True
-        
-        db.session.commit()
-        
-        return jsonify({
-            'success': True,
-            'is_favorite': is_favorite,
-            'message': f'Action {"added to" if is_favorite else "removed from"} favorites'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    preferences = load_user_preferences(current_user.id)
+    favorites = preferences.get_favorite_actions()
+    
+    if action_id in favorites:
+        favorites.remove(action_id)
+        preferences.set_favorite_actions(favorites)
+        is_favorite = False
+    else:
+        preferences.add_favorite_action(action_id)
+        is_favorite = True
+    
+    db.session.commit()
+    invalidate_onboarding_cache(current_user.id)
+    
+    return orjson_response({
+        'success': True,
+        'is_favorite': is_favorite,
+        'message': f'Action {"added to" if is_favorite else "removed from"} favorites'
+    })
 
 # Helper Functions
 
@@ -683,152 +720,164 @@ def _get_next_onboarding_steps(onboarding):
     
     return steps
 
+_TOUR_STEP_COUNTS = {
+    'welcome': 5,
+    'dashboard': 4,
+    'reviews': 6,
+    'analytics': 5,
+    'integrations': 7,
+    'automation': 6,
+    'settings': 4
+}
+
 def _get_tour_steps(tour_type):
     """Get number of steps for a tour type"""
-    tour_steps = {
-        'welcome': 5,
-        'dashboard': 4,
-        'reviews': 6,
-        'analytics': 5,
-        'integrations': 7,
-        'automation': 6,
-        'settings': 4
+    return _TOUR_STEP_COUNTS.get(tour_type, 5)
+
+_TOUR_CONTENT = {
+    'welcome': {
+        'title': 'Welcome to ReviewAssist Pro',
+        'steps': [
+            {
+                'title': 'Welcome!',
+                'content': 'Welcome to ReviewAssist Pro! Let\'s take a quick tour to get you started.',
+                'target': '.dashboard-header',
+                'position': 'bottom'
+            },
+            {
+                'title': 'Dashboard Overview',
+                'content': 'This is your main dashboard where you can see all your review metrics at a glance.',
+                'target': '.metrics-cards',
+                'position': 'bottom'
+            },
+            {
+                'title': 'Review Management',
+                'content': 'Here you can view, filter, and respond to all your reviews from different platforms.',
+                'target': '.reviews-section',
+                'position': 'top'
+            },
+            {
+                'title': 'Analytics & Insights',
+                'content': 'Get detailed analytics and AI-powered insights about your review performance.',
+                'target': '.analytics-section',
+                'position': 'top'
+            },
+            {
+                'title': 'You\'re All Set!',
+                'content': 'Great! You\'re ready to start managing your reviews. Explore the features and let us know if you need help.',
+                'target': '.user-menu',
+                'position': 'bottom-left'
+            }
+        ]
+    },
+    'dashboard': {
+        'title': 'Dashboard Overview',
+        'steps': [
+            {
+                'title': 'Key Metrics',
+                'content': 'These cards show your most important review metrics: total reviews, average rating, response time, and sentiment.',
+                'target': '.metrics-cards',
+                'position': 'bottom'
+            },
+            {
+                'title': 'Performance Charts',
+                'content': 'Visual charts help you understand trends in your review performance over time.',
+                'target': '.charts-section',
+                'position': 'top'
+            },
+            {
+                'title': 'Recent Activity',
+                'content': 'Stay updated with the latest reviews and team activity in real-time.',
+                'target': '.activity-feed',
+                'position': 'left'
+            },
+            {
+                'title': 'Customization',
+                'content': 'You can customize this dashboard by rearranging widgets and choosing what metrics to display.',
+                'target': '.dashboard-settings',
+                'position': 'bottom-left'
+            }
+        ]
     }
-    return tour_steps.get(tour_type, 5)
+}
+
+_EMPTY_TOUR = {'title': 'Tour', 'steps': []}
 
 def _get_tour_content(tour_type):
     """Get tour content and steps"""
-    tours = {
-        'welcome': {
-            'title': 'Welcome to ReviewAssist Pro',
-            'steps': [
-                {
-                    'title': 'Welcome!',
-                    'content': 'Welcome to ReviewAssist Pro! Let\'s take a quick tour to get you started.',
-                    'target': '.dashboard-header',
-                    'position': 'bottom'
-                },
-                {
-                    'title': 'Dashboard Overview',
-                    'content': 'This is your main dashboard where you can see all your review metrics at a glance.',
-                    'target': '.metrics-cards',
-                    'position': 'bottom'
-                },
-                {
-                    'title': 'Review Management',
-                    'content': 'Here you can view, filter, and respond to all your reviews from different platforms.',
-                    'target': '.reviews-section',
-                    'position': 'top'
-                },
-                {
-                    'title': 'Analytics & Insights',
-                    'content': 'Get detailed analytics and AI-powered insights about your review performance.',
-                    'target': '.analytics-section',
-                    'position': 'top'
-                },
-                {
-                    'title': 'You\'re All Set!',
-                    'content': 'Great! You\'re ready to start managing your reviews. Explore the features and let us know if you need help.',
-                    'target': '.user-menu',
-                    'position': 'bottom-left'
-                }
+    return _TOUR_CONTENT.get(tour_type, _EMPTY_TOUR)
+
+_DEFAULT_LAYOUTS = (
+    # Executive Layout
+    {
+        'name': 'Executive Overview',
+        'description': 'High-level metrics and trends for executives',
+        'is_default': True,
+        'tags': ['executive', 'overview', 'metrics'],
+        'layout_data': {
+            'widgets': [
+                {'type': 'metrics_card', 'position': {'x': 0, 'y': 0, 'w': 3, 'h': 2}},
+                {'type': 'chart', 'position': {'x': 3, 'y': 0, 'w': 6, 'h': 4}},
+                {'type': 'performance_summary', 'position': {'x': 9, 'y': 0, 'w': 3, 'h': 4}},
+                {'type': 'recent_reviews', 'position': {'x': 0, 'y': 2, 'w': 6, 'h': 3}},
+                {'type': 'team_activity', 'position': {'x': 6, 'y': 4, 'w': 6, 'h': 3}}
             ]
-        },
-        'dashboard': {
-            'title': 'Dashboard Overview',
-            'steps': [
-                {
-                    'title': 'Key Metrics',
-                    'content': 'These cards show your most important review metrics: total reviews, average rating, response time, and sentiment.',
-                    'target': '.metrics-cards',
-                    'position': 'bottom'
-                },
-                {
-                    'title': 'Performance Charts',
-                    'content': 'Visual charts help you understand trends in your review performance over time.',
-                    'target': '.charts-section',
-                    'position': 'top'
-                },
-                {
-                    'title': 'Recent Activity',
-                    'content': 'Stay updated with the latest reviews and team activity in real-time.',
-                    'target': '.activity-feed',
-                    'position': 'left'
-                },
-                {
-                    'title': 'Customization',
-                    'content': 'You can customize this dashboard by rearranging widgets and choosing what metrics to display.',
-                    'target': '.dashboard-settings',
-                    'position': 'bottom-left'
-                }
+        }
+    },
+    # Manager Layout
+    {
+        'name': 'Manager Dashboard',
+        'description': 'Operational view with team management focus',
+        'is_default': False,
+        'tags': ['manager', 'operations', 'team'],
+        'layout_data': {
+            'widgets': [
+                {'type': 'quick_actions', 'position': {'x': 0, 'y': 0, 'w': 3, 'h': 2}},
+                {'type': 'metrics_card', 'position': {'x': 3, 'y': 0, 'w': 6, 'h': 2}},
+                {'type': 'activity_feed', 'position': {'x': 9, 'y': 0, 'w': 3, 'h': 5}},
+                {'type': 'recent_reviews', 'position': {'x': 0, 'y': 2, 'w': 9, 'h': 3}},
+                {'type': 'team_activity', 'position': {'x': 0, 'y': 5, 'w': 9, 'h': 2}}
+            ]
+        }
+    },
+    # Agent Layout
+    {
+        'name': 'Agent Workspace',
+        'description': 'Review-focused layout for agents',
+        'is_default': False,
+        'tags': ['agent', 'reviews', 'responses'],
+        'layout_data': {
+            'widgets': [
+                {'type': 'quick_actions', 'position': {'x': 0, 'y': 0, 'w': 4, 'h': 2}},
+                {'type': 'notifications', 'position': {'x': 4, 'y': 0, 'w': 4, 'h': 2}},
+                {'type': 'metrics_card', 'position': {'x': 8, 'y': 0, 'w': 4, 'h': 2}},
+                {'type': 'recent_reviews', 'position': {'x': 0, 'y': 2, 'w': 12, 'h': 4}}
             ]
         }
     }
-    
-    return tours.get(tour_type, {'title': 'Tour', 'steps': []})
+)
 
 def _create_default_layouts(user_id):
-    """Create default dashboard layouts for a new user"""
-    layouts = []
-    
-    # Executive Layout
-    executive_layout = DashboardLayout(
-        user_id=user_id,
-        name='Executive Overview',
-        description='High-level metrics and trends for executives',
-        is_default=True,
-        tags='executive,overview,metrics'
-    )
-    executive_layout.set_layout_data({
-        'widgets': [
-            {'type': 'metrics_card', 'position': {'x': 0, 'y': 0, 'w': 3, 'h': 2}},
-            {'type': 'chart', 'position': {'x': 3, 'y': 0, 'w': 6, 'h': 4}},
-            {'type': 'performance_summary', 'position': {'x': 9, 'y': 0, 'w': 3, 'h': 4}},
-            {'type': 'recent_reviews', 'position': {'x': 0, 'y': 2, 'w': 6, 'h': 3}},
-            {'type': 'team_activity', 'position': {'x': 6, 'y': 4, 'w': 6, 'h': 3}}
-        ]
-    })
-    layouts.append(executive_layout)
-    
-    # Manager Layout
-    manager_layout = DashboardLayout(
-        user_id=user_id,
-        name='Manager Dashboard',
-        description='Operational view with team management focus',
-        tags='manager,operations,team'
-    )
-    manager_layout.set_layout_data({
-        'widgets': [
-            {'type': 'quick_actions', 'position': {'x': 0, 'y': 0, 'w': 3, 'h': 2}},
-            {'type': 'metrics_card', 'position': {'x': 3, 'y': 0, 'w': 6, 'h': 2}},
-            {'type': 'activity_feed', 'position': {'x': 9, 'y': 0, 'w': 3, 'h': 5}},
-            {'type': 'recent_reviews', 'position': {'x': 0, 'y': 2, 'w': 9, 'h': 3}},
-            {'type': 'team_activity', 'position': {'x': 0, 'y': 5, 'w': 9, 'h': 2}}
-        ]
-    })
-    layouts.append(manager_layout)
+    """Create default dashboard layouts for a new user and return them serialized"""
+    rows = [
+        {
+            'user_id': user_id,
+            'name': template['name'],
+            'description': template['description'],
+            'is_default': template['is_default'],
+            'tags': template['tags'],
+            'layout_data': json.dumps(template['layout_data'])
+        }
+        for template in _DEFAULT_LAYOUTS
+    ]
     
-    # Agent Layout
-    agent_layout = DashboardLayout(
-        user_id=user_id,
-        name='Agent Workspace',
-        description='Review-focused layout for agents',
-        tags='agent,reviews,responses'
-    )
-    agent_layout.set_layout_data({
-        'widgets': [
-            {'type': 'quick_actions', 'position': {'x': 0, 'y': 0, 'w': 4, 'h': 2}},
-            {'type': 'notifications', 'position': {'x': 4, 'y': 0, 'w': 4, 'h': 2}},
-            {'type': 'metrics_card', 'position': {'x': 8, 'y': 0, 'w': 4, 'h': 2}},
-            {'type': 'recent_reviews', 'position': {'x': 0, 'y': 2, 'w': 12, 'h': 4}}
-        ]
-    })
-    layouts.append(agent_layout)
+    # An inactive layout may still hold the default
+    OnboardingManager.clear_default_layout(user_id)
     
-    # Add all layouts to database
-    for layout in layouts:
-        db.session.add(layout)
+    # One multi-row INSERT ... RETURNING hands back fully populated layouts
+    layouts = db.session.scalars(insert(DashboardLayout).returning(DashboardLayout), rows).all()
     
+    # Serialize before the commit expires them, which would cost a SELECT per layout
+    layout_dicts = [layout.to_dict() for layout in layouts]
     db.session.commit()
-    return layouts
-
+    return layout_dicts
@@ -3,15 +3,20 @@ from flask_cors import cross_origin
 import stripe
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from src.models.user import db
 from src.models.auth import AuthUser
 from src.models.subscription import (
     SubscriptionPlan, UserSubscription, SubscriptionStatus, 
-    BillingCycle, PlanType, FeatureUsage, FeatureType
+    BillingCycle, PlanType, PlanFeature, FeatureUsage, FeatureType, Invoice
 )
 from src.routes.auth import token_required
-from sqlalchemy import func
+from src.services.cache import cache_get, cache_set, cache_add, cache_delete, cache_delete_pattern
+from sqlalchemy import func, update, select, bindparam
+from sqlalchemy.orm import joinedload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import orjson
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +24,127 @@ logger = logging.getLogger(__name__)
 
 payments_bp = Blueprint('payments', __name__, url_prefix='/api/payments')
 
+# Polled by the billing UI; writes below drop these keys, the TTLs only bound staleness
+SUBSCRIPTION_STATUS_CACHE_TTL = 60
+USAGE_CACHE_TTL = 10
+
+# The hottest lookups are built once; executions only bind new values against the cached compiled form
+ACTIVE_SUBSCRIPTION_STMT = select(UserSubscription).where(
+    UserSubscription.user_id == bindparam('user_id'),
+    UserSubscription.status == SubscriptionStatus.ACTIVE
+).limit(1)
+
+SUBSCRIPTION_BY_STRIPE_ID_STMT = select(UserSubscription).where(
+    UserSubscription.stripe_subscription_id == bindparam('stripe_subscription_id')
+)
+
+# Delivered webhook event ids are remembered for a day so redeliveries are skipped
+STRIPE_EVENT_DEDUPE_TTL = 86400
+
+# Stripe reads are slow (hundreds of ms each), so the shapes we build from them are cached briefly
+STRIPE_CACHE_TTL = 300
+
+def stripe_customer_key(customer_id):
+    return f"stripe_customer:{customer_id}"
+
+def stripe_payment_methods_key(customer_id):
+    return f"stripe_customer:{customer_id}:payment_methods"
+
+def stripe_invoices_key(customer_id, limit, starting_after):
+    return f"stripe_customer:{customer_id}:invoices:{limit}:{starting_after or ''}"
+
+def invalidate_stripe_invoices_cache(customer_id):
+    """Drop every cached invoice page for a customer"""
+    if customer_id:
+        cache_delete_pattern(f"stripe_customer:{customer_id}:invoices:*")
+
+def stripe_subscription_key(subscription_id):
+    return f"stripe_subscription:{subscription_id}"
+
+def stripe_event_key(event_id):
+    return f"stripe_evt:{event_id}"
+
+def subscription_status_key(user_id):
+    return f"sub_status:{user_id}"
+
+def usage_cache_key(user_id, feature):
+    return f"usage:{user_id}:{feature}"
+
+def invalidate_subscription_cache(user_id):
+    """Drop a user's cached subscription status and usage after their subscription changes"""
+    cache_delete(subscription_status_key(user_id))
+    cache_delete_pattern(usage_cache_key(user_id, '*'))
+
+def json_bytes_response(body, status=200):
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+def invalidate_stripe_customer_cache(customer_id):
+    """Drop every cached Stripe read for a customer after a write"""
+    if customer_id:
+        cache_delete(stripe_customer_key(customer_id), stripe_payment_methods_key(customer_id))
+        invalidate_stripe_invoices_cache(customer_id)
+
+def _cached_stripe(key, ttl, fetch):
+    """Return JSON-safe data derived from Stripe, calling fetch() only on a cache miss"""
+    cached = cache_get(key)
+    if cached is not None:
+        return orjson.loads(cached)
+    
+    data = fetch()
+    cache_set(key, orjson.dumps(data), ttl)
+    return data
+
+def _default_payment_method_id(customer_id):
+    """Return the customer's default payment method id"""
+    customer = _cached_stripe(
+        stripe_customer_key(customer_id),
+        STRIPE_CACHE_TTL,
+        lambda: {'default_payment_method': stripe.Customer.retrieve(customer_id).invoice_settings.default_payment_method}
+    )
+    return customer['default_payment_method']
+
+def _subscription_item_id(subscription_id):
+    """Return the id of the (single) item on a Stripe subscription"""
+    subscription = _cached_stripe(
+        stripe_subscription_key(subscription_id),
+        STRIPE_CACHE_TTL,
+        lambda: {'item_id': stripe.Subscription.retrieve(subscription_id)['items']['data'][0].id}
+    )
+    return subscription['item_id']
+
+def _stripe_price_id(plan, billing_cycle):
+    """Return the plan's Stripe Price id for a billing cycle, creating a Price on first use or after a price change"""
+    monthly = billing_cycle == 'monthly'
+    unit_amount = int((plan.monthly_price if monthly else plan.annual_price) * 100)  # Convert to cents
+    if monthly:
+        price_id, stored_amount = plan.stripe_monthly_price_id, plan.stripe_monthly_price_amount
+    else:
+        price_id, stored_amount = plan.stripe_annual_price_id, plan.stripe_annual_price_amount
+    if price_id and stored_amount == unit_amount:
+        return price_id
+    
+    # Stripe Prices are immutable, so a changed plan price gets a new one. Requests racing on the
+    # same plan and amount share an idempotency key and get back the same Price.
+    price = stripe.Price.create(
+        currency='usd',
+        unit_amount=unit_amount,
+        recurring={'interval': 'month' if monthly else 'year'},
+        product_data={'name': f'{plan.name} Plan'},
+        idempotency_key=f"plan-price:{plan.id}:{'monthly' if monthly else 'annual'}:{unit_amount}"
+    )
+    # Stored on the plan and saved with the caller's commit
+    if monthly:
+        plan.stripe_monthly_price_id, plan.stripe_monthly_price_amount = price.id, unit_amount
+    else:
+        plan.stripe_annual_price_id, plan.stripe_annual_price_amount = price.id, unit_amount
+    return price.id
+
+def _ts(timestamp):
+    """Convert a Stripe epoch timestamp to the naive UTC datetimes stored in the database"""
+    if not timestamp:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
 # Initialize Stripe
 def init_stripe():
     stripe.api_key = current_app.config.get('STRIPE_SECRET_KEY')
@@ -28,6 +154,8 @@ def init_stripe():
 @payments_bp.before_request
 def before_request():
     init_stripe()
+    # Responses are built from objects just committed; keep their loaded state instead of re-SELECTing it
+    db.session().expire_on_commit = False
 
 # Subscription Management Endpoints
 
@@ -37,37 +165,41 @@ def before_request():
 def create_subscription(current_user):
     """Create a new subscription for the user"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         plan_id = data.get('plan_id')
         billing_cycle = data.get('billing_cycle', 'monthly')
         payment_method_id = data.get('payment_method_id')
         
         # Get subscription plan
-        plan = SubscriptionPlan.query.get(plan_id)
+        plan = db.session.get(SubscriptionPlan, plan_id)
         if not plan:
             return jsonify({'error': 'Invalid subscription plan'}), 400
             
         # Check if user already has an active subscription
-        existing_subscription = UserSubscription.query.filter_by(
-            user_id=current_user.id,
-            status=SubscriptionStatus.ACTIVE
-        ).first()
+        existing_subscription = db.session.scalars(ACTIVE_SUBSCRIPTION_STMT, {'user_id': current_user.id}).first()
         
         if existing_subscription:
             return jsonify({'error': 'User already has an active subscription'}), 400
         
         # Create Stripe customer if doesn't exist
         if not current_user.stripe_customer_id:
+            customer_fields = {}
+            if payment_method_id:
+                # Attach the card and make it the default in the same call that creates the customer
+                customer_fields = {
+                    'payment_method': payment_method_id,
+                    'invoice_settings': {'default_payment_method': payment_method_id}
+                }
             stripe_customer = stripe.Customer.create(
                 email=current_user.email,
                 name=current_user.full_name,
-                metadata={'user_id': current_user.id}
+                metadata={'user_id': current_user.id},
+                **customer_fields
             )
             current_user.stripe_customer_id = stripe_customer.id
-            db.session.commit()
         
-        # Attach payment method to customer
-        if payment_method_id:
+        # Attach payment method to an existing customer; the default can only be set once it is attached
+        elif payment_method_id:
             stripe.PaymentMethod.attach(
                 payment_method_id,
                 customer=current_user.stripe_customer_id
@@ -78,26 +210,12 @@ def create_subscription(current_user):
                 current_user.stripe_customer_id,
                 invoice_settings={'default_payment_method': payment_method_id}
             )
-        
-        # Determine price based on billing cycle
-        price = plan.monthly_price if billing_cycle == 'monthly' else plan.annual_price
+            invalidate_stripe_customer_cache(current_user.stripe_customer_id)
         
         # Create Stripe subscription
         stripe_subscription = stripe.Subscription.create(
             customer=current_user.stripe_customer_id,
-            items=[{
-                'price_data': {
-                    'currency': 'usd',
-                    'product_data': {
-                        'name': f'{plan.name} Plan',
-                        'description': plan.description
-                    },
-                    'unit_amount': int(price * 100),  # Convert to cents
-                    'recurring': {
-                        'interval': 'month' if billing_cycle == 'monthly' else 'year'
-                    }
-                }
-            }],
+            items=[{'price': _stripe_price_id(plan, billing_cycle)}],
             payment_behavior='default_incomplete',
             payment_settings={'save_default_payment_method': 'on_subscription'},
             expand=['latest_invoice.payment_intent'],
@@ -116,23 +234,27 @@ def create_subscription(current_user):
             stripe_subscription_id=stripe_subscription.id,
             status=SubscriptionStatus.TRIALING,
             billing_cycle=BillingCycle(billing_cycle),
-            current_period_start=datetime.fromtimestamp(stripe_subscription.current_period_start),
-            current_period_end=datetime.fromtimestamp(stripe_subscription.current_period_end),
-            trial_end=datetime.fromtimestamp(stripe_subscription.trial_end) if stripe_subscription.trial_end else None
+            current_period_start=_ts(stripe_subscription.current_period_start),
+            current_period_end=_ts(stripe_subscription.current_period_end),
+            trial_end_date=_ts(stripe_subscription.trial_end)
         )
         
+        # The new customer id (if any) and the subscription row go in one transaction
         db.session.add(subscription)
         db.session.commit()
+        invalidate_subscription_cache(current_user.id)
         
         return jsonify({
             'subscription_id': subscription.id,
             'stripe_subscription_id': stripe_subscription.id,
             'client_secret': stripe_subscription.latest_invoice.payment_intent.client_secret,
             'status': subscription.status.value,
-            'trial_end': subscription.trial_end.isoformat() if subscription.trial_end else None
+            'trial_end': subscription.trial_end_date.isoformat() if subscription.trial_end_date else None
         })
         
     except stripe.error.StripeError as e:
+        # Keep a freshly created Stripe customer so a retry doesn't create another
+        db.session.commit()
         logger.error(f"Stripe error creating subscription: {str(e)}")
         return jsonify({'error': f'Payment processing error: {str(e)}'}), 400
     except Exception as e:
@@ -145,46 +267,27 @@ def create_subscription(current_user):
 def upgrade_subscription(current_user):
     """Upgrade user's subscription to a higher plan"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         new_plan_id = data.get('plan_id')
         billing_cycle = data.get('billing_cycle')
         
         # Get current subscription
-        current_subscription = UserSubscription.query.filter_by(
-            user_id=current_user.id,
-            status=SubscriptionStatus.ACTIVE
-        ).first()
+        current_subscription = db.session.scalars(ACTIVE_SUBSCRIPTION_STMT, {'user_id': current_user.id}).first()
         
         if not current_subscription:
             return jsonify({'error': 'No active subscription found'}), 400
         
         # Get new plan
-        new_plan = SubscriptionPlan.query.get(new_plan_id)
+        new_plan = db.session.get(SubscriptionPlan, new_plan_id)
         if not new_plan:
             return jsonify({'error': 'Invalid subscription plan'}), 400
         
-        # Update Stripe subscription
-        stripe_subscription = stripe.Subscription.retrieve(current_subscription.stripe_subscription_id)
-        
-        # Calculate new price
-        new_price = new_plan.monthly_price if billing_cycle == 'monthly' else new_plan.annual_price
-        
         # Update subscription items
         stripe.Subscription.modify(
             current_subscription.stripe_subscription_id,
             items=[{
-                'id': stripe_subscription['items']['data'][0].id,
-                'price_data': {
-                    'currency': 'usd',
-                    'product_data': {
-                        'name': f'{new_plan.name} Plan',
-                        'description': new_plan.description
-                    },
-                    'unit_amount': int(new_price * 100),
-                    'recurring': {
-                        'interval': 'month' if billing_cycle == 'monthly' else 'year'
-                    }
-                }
+                'id': _subscription_item_id(current_subscription.stripe_subscription_id),
+                'price': _stripe_price_id(new_plan, billing_cycle)
             }],
             proration_behavior='create_prorations',
             metadata={
@@ -194,12 +297,15 @@ def upgrade_subscription(current_user):
             }
         )
         
+        cache_delete(stripe_subscription_key(current_subscription.stripe_subscription_id))
+        
         # Update local subscription record
         current_subscription.plan_id = new_plan_id
         current_subscription.billing_cycle = BillingCycle(billing_cycle)
         current_subscription.updated_at = datetime.utcnow()
         
         db.session.commit()
+        invalidate_subscription_cache(current_user.id)
         
         return jsonify({
             'message': 'Subscription upgraded successfully',
@@ -220,14 +326,11 @@ def upgrade_subscription(current_user):
 def cancel_subscription(current_user):
     """Cancel user's subscription"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         immediate = data.get('immediate', False)
         
         # Get current subscription
-        subscription = UserSubscription.query.filter_by(
-            user_id=current_user.id,
-            status=SubscriptionStatus.ACTIVE
-        ).first()
+        subscription = db.session.scalars(ACTIVE_SUBSCRIPTION_STMT, {'user_id': current_user.id}).first()
         
         if not subscription:
             return jsonify({'error': 'No active subscription found'}), 400
@@ -245,7 +348,9 @@ def cancel_subscription(current_user):
             )
             subscription.cancel_at_period_end = True
         
+        cache_delete(stripe_subscription_key(subscription.stripe_subscription_id))
         db.session.commit()
+        invalidate_subscription_cache(current_user.id)
         
         return jsonify({
             'message': 'Subscription canceled successfully',
@@ -271,22 +376,29 @@ def get_payment_methods(current_user):
         if not current_user.stripe_customer_id:
             return jsonify({'payment_methods': []})
         
+        customer_id = current_user.stripe_customer_id
+        
         # Get payment methods from Stripe
-        payment_methods = stripe.PaymentMethod.list(
-            customer=current_user.stripe_customer_id,
-            type='card'
+        cards = _cached_stripe(
+            stripe_payment_methods_key(customer_id),
+            STRIPE_CACHE_TTL,
+            lambda: [
+                {
+                    'id': pm.id,
+                    'brand': pm.card.brand,
+                    'last4': pm.card.last4,
+                    'exp_month': pm.card.exp_month,
+                    'exp_year': pm.card.exp_year
+                }
+                for pm in stripe.PaymentMethod.list(customer=customer_id, type='card').data
+            ]
         )
+        if not cards:
+            return jsonify({'payment_methods': []})
         
-        methods = []
-        for pm in payment_methods.data:
-            methods.append({
-                'id': pm.id,
-                'brand': pm.card.brand,
-                'last4': pm.card.last4,
-                'exp_month': pm.card.exp_month,
-                'exp_year': pm.card.exp_year,
-                'is_default': pm.id == stripe.Customer.retrieve(current_user.stripe_customer_id).invoice_settings.default_payment_method
-            })
+        # The default is a customer-level setting, so look it up once rather than per card
+        default_pm_id = _default_payment_method_id(customer_id)
+        methods = [dict(card, is_default=card['id'] == default_pm_id) for card in cards]
         
         return jsonify({'payment_methods': methods})
         
@@ -303,7 +415,7 @@ def get_payment_methods(current_user):
 def add_payment_method(current_user):
     """Add a new payment method"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         payment_method_id = data.get('payment_method_id')
         set_as_default = data.get('set_as_default', False)
         
@@ -323,6 +435,8 @@ def add_payment_method(current_user):
                 invoice_settings={'default_payment_method': payment_method_id}
             )
         
+        invalidate_stripe_customer_cache(current_user.stripe_customer_id)
+        
         return jsonify({'message': 'Payment method added successfully'})
         
     except stripe.error.StripeError as e:
@@ -338,11 +452,12 @@ def add_payment_method(current_user):
 def remove_payment_method(current_user):
     """Remove a payment method"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         payment_method_id = data.get('payment_method_id')
         
         # Detach payment method
         stripe.PaymentMethod.detach(payment_method_id)
+        invalidate_stripe_customer_cache(current_user.stripe_customer_id)
         
         return jsonify({'message': 'Payment method removed successfully'})
         
@@ -364,10 +479,12 @@ def create_portal_session(current_user):
         if not current_user.stripe_customer_id:
             return jsonify({'error': 'No customer record found'}), 400
         
+        data = request.get_json(silent=True) or {}
+        
         # Create portal session
         session = stripe.billing_portal.Session.create(
             customer=current_user.stripe_customer_id,
-            return_url=request.json.get('return_url', request.host_url)
+            return_url=data.get('return_url', request.host_url)
         )
         
         return jsonify({'url': session.url})
@@ -388,29 +505,42 @@ def get_invoices(current_user):
     """Get user's invoices"""
     try:
         if not current_user.stripe_customer_id:
-            return jsonify({'invoices': []})
+            return jsonify({'invoices': [], 'has_more': False})
         
-        # Get invoices from Stripe
-        invoices = stripe.Invoice.list(
-            customer=current_user.stripe_customer_id,
-            limit=20
-        )
+        customer_id = current_user.stripe_customer_id
         
-        invoice_list = []
-        for invoice in invoices.data:
-            invoice_list.append({
-                'id': invoice.id,
-                'amount_paid': invoice.amount_paid / 100,  # Convert from cents
-                'amount_due': invoice.amount_due / 100,
-                'currency': invoice.currency,
-                'status': invoice.status,
-                'created': datetime.fromtimestamp(invoice.created).isoformat(),
-                'due_date': datetime.fromtimestamp(invoice.due_date).isoformat() if invoice.due_date else None,
-                'invoice_pdf': invoice.invoice_pdf,
-                'hosted_invoice_url': invoice.hosted_invoice_url
-            })
+        # Clients page with ?starting_after=<last invoice id>; Stripe caps a page at 100
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        starting_after = request.args.get('starting_after')
+        
+        def fetch_invoices():
+            # Get invoices from Stripe
+            params = {'customer': customer_id, 'limit': limit}
+            if starting_after:
+                params['starting_after'] = starting_after
+            invoices = stripe.Invoice.list(**params)
+            
+            return {
+                'invoices': [
+                    {
+                        'id': invoice.id,
+                        'amount_paid': invoice.amount_paid / 100,  # Convert from cents
+                        'amount_due': invoice.amount_due / 100,
+                        'currency': invoice.currency,
+                        'status': invoice.status,
+                        'created': _ts(invoice.created).isoformat(),
+                        'due_date': _ts(invoice.due_date).isoformat() if invoice.due_date else None,
+                        'invoice_pdf': invoice.invoice_pdf,
+                        'hosted_invoice_url': invoice.hosted_invoice_url
+                    }
+                    for invoice in invoices.data
+                ],
+                'has_more': invoices.has_more
+            }
         
-        return jsonify({'invoices': invoice_list})
+        page = _cached_stripe(stripe_invoices_key(customer_id, limit, starting_after), STRIPE_CACHE_TTL, fetch_invoices)
+        
+        return jsonify(page)
         
     except stripe.error.StripeError as e:
         logger.error(f"Stripe error getting invoices: {str(e)}")
@@ -440,109 +570,141 @@ def stripe_webhook():
         logger.error("Invalid signature in webhook")
         return jsonify({'error': 'Invalid signature'}), 400
     
-    # Handle the event
+    # Signature checked; event types nobody handles are acknowledged without touching Redis or the database
+    handler = STRIPE_EVENT_HANDLERS.get(event['type'])
+    if handler is None:
+        logger.info(f"Unhandled event type: {event['type']}")
+        return jsonify({'status': 'success'})
+    
+    # Stripe redelivers events it isn't sure we received; claim the id so each is applied once
+    event_key = stripe_event_key(event['id'])
+    if cache_add(event_key, b'1', STRIPE_EVENT_DEDUPE_TTL) is False:
+        logger.info(f"Skipping duplicate webhook event {event['id']}")
+        return jsonify({'status': 'duplicate'})
+    
+    # Apply the event in one transaction; Stripe only gets a 200 once it is committed
     try:
-        if event['type'] == 'customer.subscription.created':
-            handle_subscription_created(event['data']['object'])
-        elif event['type'] == 'customer.subscription.updated':
-            handle_subscription_updated(event['data']['object'])
-        elif event['type'] == 'customer.subscription.deleted':
-            handle_subscription_deleted(event['data']['object'])
-        elif event['type'] == 'invoice.payment_succeeded':
-            handle_payment_succeeded(event['data']['object'])
-        elif event['type'] == 'invoice.payment_failed':
-            handle_payment_failed(event['data']['object'])
-        else:
-            logger.info(f"Unhandled event type: {event['type']}")
+        user_id = handler(event['data']['object'])
+        db.session.commit()
     
     except Exception as e:
-        logger.error(f"Error handling webhook: {str(e)}")
+        db.session.rollback()
+        # Release the claim so Stripe's retry of this event is processed
+        cache_delete(event_key)
+        logger.error(f"Error handling webhook event {event['id']}: {str(e)}")
         return jsonify({'error': 'Webhook handling failed'}), 500
     
+    # Only drop cached status once the change is committed, so a concurrent read can't re-cache the old row
+    if user_id is not None:
+        invalidate_subscription_cache(user_id)
+    
     return jsonify({'status': 'success'})
 
 def handle_subscription_created(subscription):
     """Handle subscription created webhook"""
     user_id = subscription['metadata'].get('user_id')
     if user_id:
-        db_subscription = UserSubscription.query.filter_by(
-            stripe_subscription_id=subscription['id']
-        ).first()
+        db_subscription = db.session.scalars(SUBSCRIPTION_BY_STRIPE_ID_STMT, {'stripe_subscription_id': subscription['id']}).first()
         
         if db_subscription:
             db_subscription.status = SubscriptionStatus(subscription['status'])
-            db.session.commit()
             logger.info(f"Updated subscription status for user {user_id}")
+            return db_subscription.user_id
+
+def _update_subscription_by_stripe_id(stripe_subscription_id, **values):
+    """Apply values to the subscription in one UPDATE and return its user id, or None if unknown"""
+    return db.session.execute(
+        update(UserSubscription)
+        .where(UserSubscription.stripe_subscription_id == stripe_subscription_id)
+        .values(**values)
+        .returning(UserSubscription.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
 
 def handle_subscription_updated(subscription):
     """Handle subscription updated webhook"""
-    db_subscription = UserSubscription.query.filter_by(
-        stripe_subscription_id=subscription['id']
-    ).first()
+    values = {
+        'status': SubscriptionStatus(subscription['status']),
+        'current_period_start': _ts(subscription['current_period_start']),
+        'current_period_end': _ts(subscription['current_period_end']),
+        'cancel_at_period_end': bool(subscription.get('cancel_at_period_end'))
+    }
+    if subscription.get('canceled_at'):
+        values['canceled_at'] = _ts(subscription['canceled_at'])
     
-    if db_subscription:
-        db_subscription.status = SubscriptionStatus(subscription['status'])
-        db_subscription.current_period_start = datetime.fromtimestamp(subscription['current_period_start'])
-        db_subscription.current_period_end = datetime.fromtimestamp(subscription['current_period_end'])
-        
-        if subscription.get('canceled_at'):
-            db_subscription.canceled_at = datetime.fromtimestamp(subscription['canceled_at'])
-        
-        db.session.commit()
+    user_id = _update_subscription_by_stripe_id(subscription['id'], **values)
+    if user_id is not None:
         logger.info(f"Updated subscription {subscription['id']}")
+    return user_id
 
 def handle_subscription_deleted(subscription):
     """Handle subscription deleted webhook"""
-    db_subscription = UserSubscription.query.filter_by(
-        stripe_subscription_id=subscription['id']
-    ).first()
-    
-    if db_subscription:
-        db_subscription.status = SubscriptionStatus.CANCELED
-        db_subscription.canceled_at = datetime.utcnow()
-        db.session.commit()
+    user_id = _update_subscription_by_stripe_id(
+        subscription['id'],
+        status=SubscriptionStatus.CANCELED,
+        canceled_at=datetime.utcnow()
+    )
+    if user_id is not None:
         logger.info(f"Canceled subscription {subscription['id']}")
+    return user_id
 
 def handle_payment_succeeded(invoice):
     """Handle successful payment webhook"""
+    invalidate_stripe_invoices_cache(invoice.get('customer'))
     subscription_id = invoice.get('subscription')
     if subscription_id:
-        db_subscription = UserSubscription.query.filter_by(
-            stripe_subscription_id=subscription_id
-        ).first()
+        db_subscription = db.session.scalars(SUBSCRIPTION_BY_STRIPE_ID_STMT, {'stripe_subscription_id': subscription_id}).first()
         
         if db_subscription:
-            # Create invoice record
-            invoice_record = Invoice(
-                user_id=db_subscription.user_id,
-                subscription_id=db_subscription.id,
-                stripe_invoice_id=invoice['id'],
-                amount=invoice['amount_paid'] / 100,
-                currency=invoice['currency'],
-                status='paid',
-                invoice_date=datetime.fromtimestamp(invoice['created']),
-                due_date=datetime.fromtimestamp(invoice['due_date']) if invoice.get('due_date') else None
-            )
+            row = {
+                'user_id': db_subscription.user_id,
+                'subscription_id': db_subscription.id,
+                'stripe_invoice_id': invoice['id'],
+                'amount': invoice['amount_paid'] / 100,
+                'currency': invoice['currency'],
+                'status': 'paid',
+                'invoice_date': _ts(invoice['created']),
+                'due_date': _ts(invoice.get('due_date'))
+            }
+            
+            # Redis dedupe can be unavailable, so the unique invoice id keeps redeliveries from recording it twice
+            dialect = db.engine.dialect.name
+            if dialect in ('postgresql', 'sqlite'):
+                insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+                stmt = insert(Invoice).values(row).on_conflict_do_nothing(index_elements=['stripe_invoice_id'])
+                recorded = db.session.execute(stmt).rowcount
+            else:
+                recorded = not db.session.query(Invoice.id).filter_by(stripe_invoice_id=invoice['id']).first()
+                if recorded:
+                    db.session.add(Invoice(**row))
             
-            db.session.add(invoice_record)
-            db.session.commit()
-            logger.info(f"Created invoice record for subscription {subscription_id}")
+            if recorded:
+                logger.info(f"Recorded invoice {invoice['id']} for subscription {subscription_id}")
 
 def handle_payment_failed(invoice):
     """Handle failed payment webhook"""
+    invalidate_stripe_invoices_cache(invoice.get('customer'))
     subscription_id = invoice.get('subscription')
     if subscription_id:
-        db_subscription = UserSubscription.query.filter_by(
-            stripe_subscription_id=subscription_id
-        ).first()
+        db_subscription = db.session.scalars(SUBSCRIPTION_BY_STRIPE_ID_STMT, {'stripe_subscription_id': subscription_id}).first()
         
         if db_subscription:
+            logger.warning(f"Payment failed for subscription {subscription_id}")
+            
             # Update subscription status if needed
             if invoice['attempt_count'] >= 3:
                 db_subscription.status = SubscriptionStatus.PAST_DUE
-                db.session.commit()
-            
-            logger.warning(f"Payment failed for subscription {subscription_id}")
+                return db_subscription.user_id
+
+# Only these event types need to be enabled on the Stripe webhook endpoint. Each handler
+# returns the id of the user whose subscription it changed, or None
+STRIPE_EVENT_HANDLERS = {
+    'customer.subscription.created': handle_subscription_created,
+    'customer.subscription.updated': handle_subscription_updated,
+    'customer.subscription.deleted': handle_subscription_deleted,
+    'invoice.payment_succeeded': handle_payment_succeeded,
+    'invoice.payment_failed': handle_payment_failed,
+}
 
 # Usage Tracking
 
@@ -552,36 +714,43 @@ def handle_payment_failed(invoice):
 def get_usage(current_user, feature):
     """Get current usage for a feature"""
     try:
-        subscription = UserSubscription.query.filter_by(
-            user_id=current_user.id,
-            status=SubscriptionStatus.ACTIVE
-        ).first()
+        cache_key = usage_cache_key(current_user.id, feature)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return json_bytes_response(cached)
+        
+        subscription = db.session.scalars(ACTIVE_SUBSCRIPTION_STMT, {'user_id': current_user.id}).first()
         
         if not subscription:
             return jsonify({'error': 'No active subscription'}), 400
         
+        feature_type = FeatureType(feature)
+        
         # Get current usage
-        usage = SubscriptionUsage.query.filter_by(
+        usage = db.session.query(FeatureUsage).filter_by(
             subscription_id=subscription.id,
-            feature_type=FeatureType(feature),
-            period_start=subscription.current_period_start
+            feature_type=feature_type,
+            usage_period_start=subscription.current_period_start
         ).first()
         
         current_usage = usage.usage_count if usage else 0
         
-        # Get plan limits
-        plan_feature = subscription.plan.features.filter_by(
-            feature_type=FeatureType(feature)
+        # Get plan limits straight from the foreign key; only the one feature row is needed
+        plan_feature = db.session.query(PlanFeature).filter_by(
+            plan_id=subscription.plan_id,
+            feature_type=feature_type
         ).first()
         
         limit = plan_feature.limit_value if plan_feature else 0
         
-        return jsonify({
+        body = orjson.dumps({
             'feature': feature,
             'current_usage': current_usage,
             'limit': limit,
             'percentage_used': (current_usage / limit * 100) if limit > 0 else 0
         })
+        cache_set(cache_key, body, USAGE_CACHE_TTL)
+        return json_bytes_response(body)
         
     except Exception as e:
         logger.error(f"Error getting usage: {str(e)}")
@@ -593,17 +762,26 @@ def get_usage(current_user, feature):
 def get_subscription_status(current_user):
     """Get user's subscription status"""
     try:
-        subscription = UserSubscription.query.filter_by(
+        cache_key = subscription_status_key(current_user.id)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return json_bytes_response(cached)
+        
+        subscription = db.session.query(UserSubscription).options(
+            joinedload(UserSubscription.plan)
+        ).filter_by(
             user_id=current_user.id
         ).order_by(UserSubscription.created_at.desc()).first()
         
         if not subscription:
-            return jsonify({
+            body = orjson.dumps({
                 'has_subscription': False,
                 'status': 'none'
             })
+            cache_set(cache_key, body, SUBSCRIPTION_STATUS_CACHE_TTL)
+            return json_bytes_response(body)
         
-        return jsonify({
+        body = orjson.dumps({
             'has_subscription': True,
             'subscription_id': subscription.id,
             'plan_name': subscription.plan.name,
@@ -611,10 +789,12 @@ def get_subscription_status(current_user):
             'billing_cycle': subscription.billing_cycle.value,
             'current_period_start': subscription.current_period_start.isoformat(),
             'current_period_end': subscription.current_period_end.isoformat(),
-            'trial_end': subscription.trial_end.isoformat() if subscription.trial_end else None,
+            'trial_end': subscription.trial_end_date.isoformat() if subscription.trial_end_date else None,
             'cancel_at_period_end': subscription.cancel_at_period_end,
             'canceled_at': subscription.canceled_at.isoformat() if subscription.canceled_at else None
         })
+        cache_set(cache_key, body, SUBSCRIPTION_STATUS_CACHE_TTL)
+        return json_bytes_response(body)
         
     except Exception as e:
         logger.error(f"Error getting subscription status: {str(e)}")
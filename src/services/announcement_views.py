@@ -0,0 +1,28 @@
+"""
+Announcement View Counter
+Buffers announcement views from the onboarding routes and adds them to
+FeatureAnnouncement.view_count from a background thread, one UPDATE per
+announcement per batch.
+"""
+
+import os
+from collections import Counter
+
+from src.models.user import db
+from src.models.onboarding import OnboardingManager
+from src.services.batch_writer import BatchWriter
+
+class AnnouncementViewBuffer(BatchWriter):
+    """Batch writer that coalesces view counter increments per announcement"""
+
+    name = 'announcement-view-writer'
+
+    def write_batch(self, batch):
+        for announcement_id, views in Counter(batch).items():
+            OnboardingManager.increment_announcement_views(announcement_id, views)
+
+view_buffer = AnnouncementViewBuffer(
+    db,
+    batch_size=int(os.getenv('ANNOUNCEMENT_VIEW_BUFFER_SIZE', 1000)),
+    flush_interval=int(os.getenv('ANNOUNCEMENT_VIEW_BUFFER_TIME_MS', 5000)) / 1000
+)
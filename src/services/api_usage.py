@@ -0,0 +1,49 @@
+"""
+API Usage Recorder
+Buffers API key usage from the api_key_required decorator and writes it from a
+background thread: usage log rows in batches, and one counter UPDATE per key.
+If a batch fails, BatchWriter retries it row by row, so each surviving row
+still inserts its log entry and bumps its key's counters together.
+"""
+
+import os
+from collections import defaultdict
+
+from sqlalchemy import update
+
+from src.models.user import db
+from src.models.integrations import APIKey, APIUsageLog
+from src.services.batch_writer import BatchWriter
+
+class APIUsageBuffer(BatchWriter):
+    """Batch writer for API usage rows with per-key counter coalescing"""
+
+    name = 'api-usage-writer'
+
+    def write_batch(self, batch):
+        # Plain dict rows go straight to a multi-row INSERT without building ORM objects
+        self.db.session.bulk_insert_mappings(APIUsageLog, batch)
+
+        # Coalesce counter increments so each key gets a single UPDATE per batch
+        requests_per_key = defaultdict(int)
+        last_used_per_key = {}
+        for row in batch:
+            key_id = row['api_key_id']
+            requests_per_key[key_id] += 1
+            last_used_per_key[key_id] = max(row['created_at'], last_used_per_key.get(key_id, row['created_at']))
+
+        for key_id, delta in requests_per_key.items():
+            self.db.session.execute(
+                update(APIKey)
+                .where(APIKey.id == key_id)
+                .values(
+                    total_requests=APIKey.total_requests + delta,
+                    last_used_at=last_used_per_key[key_id]
+                )
+            )
+
+usage_buffer = APIUsageBuffer(
+    db,
+    batch_size=int(os.getenv('API_USAGE_BUFFER_SIZE', 1000)),
+    flush_interval=int(os.getenv('API_USAGE_BUFFER_TIME_MS', 500)) / 1000
+)
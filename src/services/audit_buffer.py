@@ -0,0 +1,42 @@
+"""
+Buffered Audit Log Writer
+Queues audit log rows in memory and writes them in batches from a background
+thread, keeping the audit commit off the request path.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+
+from src.services.batch_writer import BatchWriter
+
+_failure_logger = None
+_failure_logger_lock = threading.Lock()
+
+def get_failure_logger():
+    """Logger for audit failures whose records are handed to a background listener thread"""
+    global _failure_logger
+    if _failure_logger is not None:
+        return _failure_logger
+    with _failure_logger_lock:
+        if _failure_logger is None:
+            records = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(records, logging.StreamHandler())
+            listener.start()
+            atexit.register(listener.stop)
+
+            failure_logger = logging.getLogger(f"{__name__}.failures")
+            failure_logger.addHandler(logging.handlers.QueueHandler(records))
+            failure_logger.propagate = False
+            _failure_logger = failure_logger
+    return _failure_logger
+
+class AuditLogBuffer(BatchWriter):
+    """Bounded queue of audit rows drained in batches by a daemon thread"""
+
+    name = 'audit-log-writer'
+
+    def write_batch(self, batch):
+        self.db.session.bulk_save_objects(batch)
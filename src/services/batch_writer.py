@@ -0,0 +1,112 @@
+"""
+Background Batch Writer
+Bounded in-memory queue drained by a daemon thread that hands batches to a
+write callback inside an application context. Used to keep bookkeeping
+writes (audit events, API usage) off the request path. A batch that fails to
+commit is retried one item at a time, so only the offending items are lost.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+
+logger = logging.getLogger(__name__)
+
+class BatchWriter(ABC):
+    """Queue items from request handlers and write them in batches from a daemon thread"""
+
+    name = 'batch-writer'
+
+    def __init__(self, db, max_size=10000, batch_size=500, flush_interval=0.1):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped_events = 0
+        self._queue = queue.Queue(maxsize=max_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, app, item):
+        """Enqueue an item, returning False if the buffer is full"""
+        self._ensure_started()
+        try:
+            # Each item carries its own app, so it is written to that app's database
+            self._queue.put_nowait((app, item))
+            return True
+        except queue.Full:
+            self.dropped_events += 1
+            logger.warning(f"{self.name} buffer full, dropped {self.dropped_events} items so far")
+            return False
+
+    def flush(self):
+        """Synchronously write everything currently queued"""
+        batch = self._drain(block=False)
+        while batch:
+            self._write(batch)
+            batch = self._drain(block=False)
+
+    @abstractmethod
+    def write_batch(self, batch):
+        """Persist a batch; called inside an app context and followed by a commit"""
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            batch = self._drain(block=True)
+            if batch:
+                self._write(batch)
+
+    def _drain(self, block):
+        """Collect up to batch_size items, waiting at most flush_interval after the first"""
+        try:
+            batch = [self._queue.get(block=block)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        items_per_app = {}
+        for app, item in batch:
+            items_per_app.setdefault(app, []).append(item)
+
+        for app, items in items_per_app.items():
+            with app.app_context():
+                try:
+                    if not self._commit(items) and len(items) > 1:
+                        # Retry one item at a time so a single bad row doesn't take the batch down with it
+                        for item in items:
+                            self._commit([item])
+                finally:
+                    self.db.session.remove()
+
+    def _commit(self, items):
+        """Write and commit items, rolling back and returning False on failure"""
+        try:
+            self.write_batch(items)
+            self.db.session.commit()
+            return True
+        except Exception as e:
+            self.db.session.rollback()
+            logger.error(f"{self.name} failed to write {len(items)} items: {e}")
+            return False
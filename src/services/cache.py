@@ -0,0 +1,104 @@
+"""
+Redis Cache Service
+Shared Redis client with small cache-aside helpers. Caching is disabled when
+REDIS_URL is not configured, and Redis errors are logged and treated as misses
+so a cache outage never fails a request.
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+def get_redis() -> Optional[redis.Redis]:
+    """Return the shared Redis client, or None when caching is not configured"""
+    global _client
+    if _client is None:
+        redis_url = os.getenv('REDIS_URL')
+        if not redis_url:
+            return None
+        _client = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _client
+
+def cache_get(key: str) -> Optional[bytes]:
+    """Get a cached value, returning None on a miss or when Redis is unavailable"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache get failed for {key}: {e}")
+        return None
+
+def cache_set(key: str, value, ttl: int) -> None:
+    """Store a value with a TTL in seconds"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.setex(key, ttl, value)
+    except redis.RedisError as e:
+        logger.warning(f"Cache set failed for {key}: {e}")
+
+def cache_add(key: str, value, ttl: int) -> Optional[bool]:
+    """Store a value only if the key is absent; None means Redis could not answer"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return bool(client.set(key, value, nx=True, ex=ttl))
+    except redis.RedisError as e:
+        logger.warning(f"Cache add failed for {key}: {e}")
+        return None
+
+def cache_get_many(keys: List[str]) -> List[Optional[bytes]]:
+    """Get several cached values in one round trip; misses and Redis errors come back as None"""
+    client = get_redis()
+    if client is None or not keys:
+        return [None] * len(keys)
+    try:
+        return client.mget(keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache get failed for {len(keys)} keys: {e}")
+        return [None] * len(keys)
+
+def cache_set_many(mapping: Dict[str, bytes], ttl: int) -> None:
+    """Store several values with the same TTL in one pipelined round trip"""
+    client = get_redis()
+    if client is None or not mapping:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.setex(key, ttl, value)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Cache set failed for {len(mapping)} keys: {e}")
+
+def cache_delete(*keys: str) -> None:
+    """Delete one or more cached keys"""
+    client = get_redis()
+    if client is None or not keys:
+        return
+    try:
+        client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache delete failed for {keys}: {e}")
+
+def cache_delete_pattern(pattern: str) -> None:
+    """Delete every key matching a glob pattern, using SCAN rather than KEYS"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        keys = list(client.scan_iter(match=pattern, count=500))
+        if keys:
+            client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache delete failed for pattern {pattern}: {e}")
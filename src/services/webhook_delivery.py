@@ -0,0 +1,89 @@
+"""
+Webhook Delivery Service
+Delivers webhook payloads from a background thread pool so request handlers
+return immediately. Results are kept in memory for a short while so clients
+can poll for the outcome of a delivery.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_DELIVERIES = 1000
+DELIVERY_TIMEOUT = 10  # seconds
+
+DELIVERY_WORKERS = int(os.getenv('WEBHOOK_DELIVERY_WORKERS', 8))
+
+_executor = ThreadPoolExecutor(max_workers=DELIVERY_WORKERS, thread_name_prefix='webhook-delivery')
+
+def _build_http_session() -> requests.Session:
+    """Shared session that keeps connections (and TLS sessions) alive across deliveries"""
+    session = requests.Session()
+    # Retries are handled by _deliver with backoff, so the adapter never retries itself
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=max(DELIVERY_WORKERS, 64), max_retries=Retry(total=0))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+_http = _build_http_session()
+_deliveries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_deliveries_lock = threading.Lock()
+
+def _set_status(task_id: str, **fields):
+    with _deliveries_lock:
+        if task_id in _deliveries:
+            _deliveries[task_id].update(fields)
+
+def _deliver(task_id: str, url: str, payload_json: bytes, headers: Dict[str, str], max_retries: int):
+    """POST the payload, retrying connection failures with exponential backoff"""
+    for attempt in range(1, max_retries + 1):
+        try:
+            response = _http.post(url, data=payload_json, headers=headers, timeout=DELIVERY_TIMEOUT)
+            _set_status(
+                task_id,
+                status='delivered',
+                attempts=attempt,
+                response={
+                    'status_code': response.status_code,
+                    'response_time_ms': int(response.elapsed.total_seconds() * 1000),
+                    'headers': dict(response.headers)
+                }
+            )
+            return
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Webhook delivery {task_id} attempt {attempt} failed: {e}")
+            _set_status(task_id, attempts=attempt, error=str(e))
+            if attempt < max_retries:
+                time.sleep(2 ** (attempt - 1))
+
+    _set_status(task_id, status='failed')
+
+def enqueue_delivery(owner_id: int, url: str, payload_json: bytes, headers: Dict[str, str], max_retries: int = 3) -> str:
+    """Queue a webhook delivery and return its task id"""
+    task_id = uuid.uuid4().hex
+    with _deliveries_lock:
+        _deliveries[task_id] = {'owner_id': owner_id, 'status': 'queued', 'attempts': 0}
+        while len(_deliveries) > MAX_TRACKED_DELIVERIES:
+            _deliveries.popitem(last=False)
+
+    _executor.submit(_deliver, task_id, url, payload_json, headers, max(1, max_retries))
+    return task_id
+
+def get_delivery_status(task_id: str, owner_id: int) -> Optional[Dict[str, Any]]:
+    """Return the tracked state of a delivery, or None if unknown or owned by someone else"""
+    with _deliveries_lock:
+        delivery = _deliveries.get(task_id)
+        if not delivery or delivery['owner_id'] != owner_id:
+            return None
+        return {key: value for key, value in delivery.items() if key != 'owner_id'}
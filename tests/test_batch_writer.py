@@ -0,0 +1,22 @@
+from datetime import datetime
+from src.models.subscription import Invoice
+from src.services.batch_writer import BatchWriter
+
+class InvoiceWriter(BatchWriter):
+    def write_batch(self, batch):
+        self.db.session.bulk_insert_mappings(Invoice, batch)
+
+def invoice_row(stripe_invoice_id):
+    return {
+        "user_id": 1, "subscription_id": 1, "stripe_invoice_id": stripe_invoice_id,
+        "amount": 10, "currency": "usd", "status": "paid", "invoice_date": datetime(2026, 10, 1)
+    }
+
+def test_failed_batch_only_drops_bad_rows(app, db):
+    writer = InvoiceWriter(db)
+    writer._write([(app, invoice_row("in_a"))])
+    # in_a is already stored, so the batch fails as a whole and is retried row by row
+    writer._write([(app, invoice_row("in_a")), (app, invoice_row("in_b")), (app, invoice_row("in_c"))])
+
+    with app.app_context():
+        assert sorted(invoice.stripe_invoice_id for invoice in Invoice.query.all()) == ["in_a", "in_b", "in_c"]
@@ -169,9 +169,11 @@ def test_admin_delete_help_article(client, db):
     db.session.add(article)
     db.session.commit()
 
-    response = client.delete(f"/customer-success/admin/help/articles/{article.id}", headers={"Authorization": f"Bearer {token}"})
+    article_id = article.id
+
+    response = client.delete(f"/customer-success/admin/help/articles/{article_id}", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 204
-    assert db.session.query(HelpArticle).get(article.id) is None
+    assert db.session.query(HelpArticle).get(article_id) is None
 
 def test_get_customer_health_score(client, db):
     user = db.session.query(AuthUser).first()
@@ -256,9 +258,11 @@ def test_admin_delete_onboarding_step(client, db):
     db.session.add(onboarding_step)
     db.session.commit()
 
-    response = client.delete(f"/customer-success/admin/onboarding-progress/{onboarding_step.id}", headers={"Authorization": f"Bearer {token}"})
+    onboarding_step_id = onboarding_step.id
+
+    response = client.delete(f"/customer-success/admin/onboarding-progress/{onboarding_step_id}", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 204
-    assert db.session.query(OnboardingProgress).get(onboarding_step.id) is None
+    assert db.session.query(OnboardingProgress).get(onboarding_step_id) is None
 
 def test_admin_create_customer_health_score(client, db):
     admin_user = db.session.query(AuthUser).filter_by(role=UserRole.ADMIN).first()
@@ -305,9 +309,11 @@ def test_admin_delete_customer_health_score(client, db):
     db.session.add(health_score)
     db.session.commit()
 
-    response = client.delete(f"/customer-success/admin/success/health-score/{health_score.id}", headers={"Authorization": f"Bearer {token}"})
+    health_score_id = health_score.id
+
+    response = client.delete(f"/customer-success/admin/success/health-score/{health_score_id}", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == 204
-    assert db.session.query(CustomerHealthScore).get(health_score.id) is None
+    assert db.session.query(CustomerHealthScore).get(health_score_id) is None
 
 def test_admin_trigger_health_score_calculation(client, db):
     admin_user = db.session.query(AuthUser).filter_by(role=UserRole.ADMIN).first()
@@ -319,3 +325,44 @@ def test_admin_trigger_health_score_calculation(client, db):
     assert response.json["success"] == True
     assert response.json["message"] == "Customer health scores calculation triggered"
 
+
+def test_admin_get_all_chat_sessions(client, db):
+    admin_user = db.session.query(AuthUser).filter_by(role=UserRole.ADMIN).first()
+    response = client.post("/api/auth/login", json={"email": admin_user.email, "password": "password"})
+    token = response.json["access_token"]
+
+    client.post("/customer-success/chat/sessions", json={"visitor_name": "Listed Visitor", "visitor_email": "listed@example.com", "subject": "Chat Inquiry"})
+
+    response = client.get("/customer-success/admin/chat/sessions", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json["success"] == True
+    assert response.json["sessions"][0]["visitor_name"] == "Listed Visitor"
+
+def test_admin_create_feature_adoption(client, db):
+    admin_user = db.session.query(AuthUser).filter_by(role=UserRole.ADMIN).first()
+    response = client.post("/api/auth/login", json={"email": admin_user.email, "password": "password"})
+    token = response.json["access_token"]
+
+    new_adoption_data = {
+        "user_id": admin_user.id,
+        "feature_name": "ai_responses",
+        "first_used_at": "2025-01-01T09:30:00",
+        "last_used_at": 1735725600
+    }
+    response = client.post("/customer-success/admin/success/feature-adoption", headers={"Authorization": f"Bearer {token}"}, json=new_adoption_data)
+    assert response.status_code == 201
+    assert response.json["feature_adoption"]["first_used_at"] == "2025-01-01T09:30:00"
+    assert response.json["feature_adoption"]["last_used_at"] == "2025-01-01T10:00:00"
+
+def test_admin_endpoint_requires_admin(client, db):
+    agent = AuthUser(email="agent@example.com", first_name="Agent", last_name="User", role=UserRole.AGENT)
+    agent.set_password("password")
+    db.session.add(agent)
+    db.session.commit()
+
+    response = client.post("/api/auth/login", json={"email": "agent@example.com", "password": "password"})
+    token = response.json["access_token"]
+
+    response = client.post("/customer-success/admin/help/categories", headers={"Authorization": f"Bearer {token}"}, json={"name": "Forbidden Category"})
+    assert response.status_code == 403
+    assert response.json == {"success": False, "error": "Admin access required"}
@@ -0,0 +1,14 @@
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from src.routes.enterprise import encode_audit_cursor, decode_audit_cursor
+
+def test_audit_cursor_round_trip():
+    log = SimpleNamespace(timestamp=datetime(2026, 10, 1, 12, 30, 15, 250000), id="a1b2c3")
+    cursor = encode_audit_cursor(log)
+    assert decode_audit_cursor(cursor) == (log.timestamp, log.id)
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24=", "WzEsMiwzXQ=="])
+def test_malformed_audit_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_audit_cursor(cursor)
@@ -0,0 +1,49 @@
+import hashlib
+import orjson
+import src.routes.integrations as integrations_routes
+from src.models.auth import AuthUser
+from src.models.integrations import WebhookEndpoint, APIKeyManager
+from src.models.review import Review
+
+def login(client, db):
+    user = db.session.query(AuthUser).first()
+    response = client.post("/api/auth/login", json={"email": user.email, "password": "password"})
+    return user, {"Authorization": f"Bearer {response.json['access_token']}"}
+
+def test_webhook_test_delivery_is_signed(client, db, monkeypatch):
+    user, headers = login(client, db)
+    webhook = WebhookEndpoint(user_id=user.id, name="Test Hook", url="http://example.com/hook", secret="s3cret")
+    db.session.add(webhook)
+    db.session.commit()
+
+    deliveries = []
+    monkeypatch.setattr(integrations_routes, "enqueue_delivery", lambda owner_id, url, payload, delivery_headers, max_retries: deliveries.append((payload, delivery_headers)) or "task-1")
+
+    response = client.post(f"/api/integrations/webhooks/{webhook.id}/test", headers=headers)
+    assert response.status_code == 202
+
+    payload, delivery_headers = deliveries[0]
+    assert orjson.loads(payload)["event_type"] == "webhook.test"
+    # The HMAC header verifies against the exact bytes that are posted
+    assert webhook.verify_signature(payload, delivery_headers["X-Webhook-Signature-256"])
+    assert not webhook.verify_signature(payload + b" ", delivery_headers["X-Webhook-Signature-256"])
+    # The old header keeps the pre-HMAC scheme for receivers that haven't switched yet
+    assert delivery_headers["X-Webhook-Signature"] == "sha256=" + hashlib.sha256(b"s3cret" + payload).hexdigest()
+
+def test_public_reviews_query_error_returns_json_500(client, db):
+    user = db.session.query(AuthUser).first()
+    _, api_key = APIKeyManager.create_api_key(user.id, "Reader", ["read:reviews"])
+    headers = {"X-API-Key": api_key}
+
+    response = client.get("/api/integrations/api/v1/reviews", headers=headers)
+    assert response.status_code == 200
+    assert response.json["data"] == []
+
+    # The query fails before streaming starts, so the route's error body comes back intact
+    Review.__table__.drop(db.engine)
+    try:
+        response = client.get("/api/integrations/api/v1/reviews", headers=headers)
+        assert response.status_code == 500
+        assert response.json["success"] is False
+    finally:
+        Review.__table__.create(db.engine)
@@ -0,0 +1,80 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from src.models.auth import AuthUser
+from src.models.onboarding import DashboardLayout, FeatureAnnouncement, UserAnnouncementView
+
+def login(client, db):
+    user = db.session.query(AuthUser).first()
+    response = client.post("/api/auth/login", json={"email": user.email, "password": "password"})
+    return user, {"Authorization": f"Bearer {response.json['access_token']}"}
+
+def test_default_layouts_created_once(client, db):
+    user, headers = login(client, db)
+
+    response = client.get("/api/onboarding/dashboard/layouts", headers=headers)
+    assert response.status_code == 200
+    layouts = response.json["layouts"]
+    assert [layout["name"] for layout in layouts] == ["Executive Overview", "Manager Dashboard", "Agent Workspace"]
+    assert all(layout["id"] for layout in layouts)
+    assert layouts[0]["tags"] == ["executive", "overview", "metrics"]
+    assert [layout["is_default"] for layout in layouts] == [True, False, False]
+
+    response = client.get("/api/onboarding/dashboard/layouts", headers=headers)
+    assert sorted(layout["id"] for layout in response.json["layouts"]) == sorted(layout["id"] for layout in layouts)
+
+def test_new_default_layout_replaces_old_default(client, db):
+    user, headers = login(client, db)
+
+    response = client.post("/api/onboarding/dashboard/layouts", headers=headers, json={"name": "Mine", "tags": ["a,b", "c"], "is_default": True})
+    assert response.status_code == 200
+    created = response.json["layout"]
+    assert created["tags"] == ["a,b", "c"]
+
+    defaults = DashboardLayout.query.filter_by(user_id=user.id, is_default=True).all()
+    assert [layout.id for layout in defaults] == [created["id"]]
+
+    other = DashboardLayout.query.filter_by(user_id=user.id, name="Agent Workspace").one()
+    response = client.put(f"/api/onboarding/dashboard/layouts/{other.id}", headers=headers, json={"is_default": True})
+    assert response.status_code == 200
+    db.session.expire_all()
+    defaults = DashboardLayout.query.filter_by(user_id=user.id, is_default=True).all()
+    assert [layout.id for layout in defaults] == [other.id]
+
+def test_second_default_layout_violates_unique_index(client, db):
+    user = db.session.query(AuthUser).first()
+    db.session.add(DashboardLayout(user_id=user.id, name="Extra", layout_data="{}", is_default=True))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+def test_legacy_comma_separated_tags_are_read(client, db):
+    user = db.session.query(AuthUser).first()
+    db.session.execute(
+        text("INSERT INTO dashboard_layouts (user_id, name, layout_data, tags, is_default, is_active, usage_count, created_at, updated_at) "
+             "VALUES (:user_id, 'Legacy', '{}', 'x,y', 0, 1, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"),
+        {"user_id": user.id}
+    )
+    db.session.commit()
+    layout = DashboardLayout.query.filter_by(name="Legacy").one()
+    assert layout.to_dict()["tags"] == ["x", "y"]
+
+def test_announcement_view_and_dismiss_upsert_one_row(client, db):
+    user, headers = login(client, db)
+    announcement = FeatureAnnouncement(title="New", content="Something new", start_date=datetime.utcnow() - timedelta(days=1), is_active=True)
+    db.session.add(announcement)
+    db.session.commit()
+
+    for _ in range(2):
+        assert client.post(f"/api/onboarding/announcements/{announcement.id}/view", headers=headers).status_code == 200
+    assert client.post(f"/api/onboarding/announcements/{announcement.id}/dismiss", headers=headers).status_code == 200
+
+    views = UserAnnouncementView.query.filter_by(user_id=user.id, announcement_id=announcement.id).all()
+    assert len(views) == 1
+    assert views[0].dismissed
+
+    response = client.get("/api/onboarding/announcements", headers=headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json["announcements"]] == [announcement.id]
+    assert response.json["announcements"][0]["user_view"]["dismissed"] is True
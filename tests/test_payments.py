@@ -0,0 +1,117 @@
+import fnmatch
+import pytest
+import stripe
+from datetime import datetime
+import src.routes.payments as payments_routes
+from src.services import cache
+from src.models.auth import AuthUser
+from src.models.subscription import SubscriptionPlan, UserSubscription, SubscriptionStatus, PlanType, Invoice
+
+class FakeRedis:
+    """Just enough of redis.Redis for the cache helpers"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match=None, count=None):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(cache, "_client", client)
+    return client
+
+@pytest.fixture(scope="module")
+def subscription(app, db):
+    user = db.session.query(AuthUser).first()
+    plan = SubscriptionPlan(name="Starter", plan_type=PlanType.STARTER, monthly_price=10, annual_price=100)
+    db.session.add(plan)
+    db.session.flush()
+    subscription = UserSubscription(
+        user_id=user.id, plan_id=plan.id, stripe_subscription_id="sub_test", status=SubscriptionStatus.ACTIVE,
+        current_period_start=datetime(2026, 10, 1), current_period_end=datetime(2026, 11, 1)
+    )
+    db.session.add(subscription)
+    db.session.commit()
+    return subscription
+
+def login(client, db):
+    user = db.session.query(AuthUser).first()
+    response = client.post("/api/auth/login", json={"email": user.email, "password": "password"})
+    return {"Authorization": f"Bearer {response.json['access_token']}"}
+
+def post_event(client, monkeypatch, event):
+    monkeypatch.setattr(stripe.Webhook, "construct_event", lambda payload, sig_header, secret: event)
+    return client.post("/api/payments/webhook", data=b"{}", headers={"Stripe-Signature": "t=1,v1=test"})
+
+def subscription_updated(event_id, status):
+    return {
+        "id": event_id,
+        "type": "customer.subscription.updated",
+        "data": {"object": {
+            "id": "sub_test", "status": status, "cancel_at_period_end": False,
+            "current_period_start": 1790000000, "current_period_end": 1792000000
+        }}
+    }
+
+def test_subscription_status(client, db, subscription):
+    response = client.get("/api/payments/subscription/status", headers=login(client, db))
+    assert response.status_code == 200
+    assert response.json["has_subscription"] is True
+    assert response.json["plan_name"] == "Starter"
+    assert response.json["cancel_at_period_end"] is False
+
+def test_webhook_skips_duplicate_event(client, db, subscription, redis_client, monkeypatch):
+    response = post_event(client, monkeypatch, subscription_updated("evt_dup", "past_due"))
+    assert response.status_code == 200
+    assert response.json["status"] == "success"
+
+    response = post_event(client, monkeypatch, subscription_updated("evt_dup", "active"))
+    assert response.json["status"] == "duplicate"
+
+    db.session.expire_all()
+    assert db.session.get(UserSubscription, subscription.id).status == SubscriptionStatus.PAST_DUE
+
+def test_webhook_failure_releases_claim(client, db, subscription, redis_client, monkeypatch):
+    def failing_handler(obj):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as m:
+        m.setitem(payments_routes.STRIPE_EVENT_HANDLERS, "customer.subscription.updated", failing_handler)
+        response = post_event(client, m, subscription_updated("evt_retry", "canceled"))
+    assert response.status_code == 500
+    assert payments_routes.stripe_event_key("evt_retry") not in redis_client.data
+
+    # Stripe's retry of the same event is applied once the handler works again
+    response = post_event(client, monkeypatch, subscription_updated("evt_retry", "canceled"))
+    assert response.status_code == 200
+    assert response.json["status"] == "success"
+    db.session.expire_all()
+    assert db.session.get(UserSubscription, subscription.id).status == SubscriptionStatus.CANCELED
+
+def test_payment_succeeded_records_invoice_once(client, db, subscription, redis_client, monkeypatch):
+    invoice = {"id": "in_test", "customer": "cus_test", "subscription": "sub_test", "amount_paid": 1500, "currency": "usd", "created": 1790000000}
+    for event_id in ("evt_paid_1", "evt_paid_2"):
+        response = post_event(client, monkeypatch, {"id": event_id, "type": "invoice.payment_succeeded", "data": {"object": invoice}})
+        assert response.status_code == 200
+
+    invoices = Invoice.query.filter_by(stripe_invoice_id="in_test").all()
+    assert len(invoices) == 1
+    assert float(invoices[0].amount) == 15.0